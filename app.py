@@ -14,10 +14,11 @@ FIXED: Database column mapping, laundry toggle, times_worn tracking
 import streamlit as st
 import sqlite3
 from datetime import datetime, timedelta
-from classifier import ClothingClassifier
-from recommender import OutfitRecommender
-from weather import WeatherService
-from profile import StyleProfileManager
+from PIL import Image
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import time
 import os
 
 # Page config
@@ -30,37 +31,144 @@ st.set_page_config(
 # Database path
 DB_PATH = 'wardrobe.db'
 
+# Classification option sets (module scope so reruns don't rebuild them)
+TYPE_MAP = {
+    't-shirt': 'top', 'shirt': 'top', 'blouse': 'top', 'sweater': 'top', 'hoodie': 'top',
+    'jeans': 'bottom', 'trousers': 'bottom', 'pants': 'bottom', 'shorts': 'bottom', 'skirt': 'bottom',
+    'dress': 'dress', 'jumpsuit': 'dress',
+    'sneakers': 'shoes', 'formal shoes': 'shoes', 'boots': 'shoes', 'sandals': 'shoes',
+    'jacket': 'outerwear', 'coat': 'outerwear', 'blazer': 'outerwear', 'cardigan': 'outerwear'
+}
+TYPE_OPTIONS = ("top", "bottom", "dress", "shoes", "outerwear")
+TYPE_IDX = {t: i for i, t in enumerate(TYPE_OPTIONS)}
+FORMALITY_OPTIONS = ("casual", "business-casual", "formal", "athletic")
+FORMALITY_IDX = {f: i for i, f in enumerate(FORMALITY_OPTIONS)}
+PATTERN_OPTIONS = ("solid", "striped", "checkered", "floral", "printed")
+PATTERN_IDX = {p: i for i, p in enumerate(PATTERN_OPTIONS)}
+
+# Image folder
+IMAGES_DIR = 'wardrobe_images'
+
+@st.cache_data(ttl=2, show_spinner=False)
+def _existing_images():
+    """Set of image filenames on disk - one scandir instead of a stat() per item"""
+    if not os.path.isdir(IMAGES_DIR):
+        return set()
+    return {entry.name for entry in os.scandir(IMAGES_DIR)}
+
+def img_ok(path):
+    """Check an image path exists using the cached directory listing"""
+    return bool(path) and os.path.basename(path) in _existing_images()
+
+# Expose wardrobe_images/ through Streamlit's static server (app/static/...)
+# so the browser caches images instead of st.image re-encoding them per rerun
+STATIC_DIR = 'static'
+if not os.path.islink(STATIC_DIR) and not os.path.isdir(STATIC_DIR):
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    os.symlink(IMAGES_DIR, STATIC_DIR)
+
+def render_image(path, caption=None, thumb=False):
+    """Render a wardrobe image as a plain <img> served statically"""
+    name = os.path.basename(path)
+    if thumb:
+        # Grid views use the small thumbnail when one was generated on save
+        thumb_name = f"{os.path.splitext(name)[0]}_thumb.webp"
+        if thumb_name in _existing_images():
+            name = thumb_name
+    html = (f'<img loading="lazy" src="app/static/{name}" '
+            f'style="width:100%;border-radius:8px;">')
+    if caption:
+        html += f'<div style="text-align:center;font-size:0.85em;opacity:0.7;">{caption}</div>'
+    st.markdown(html, unsafe_allow_html=True)
+
 # Initialize services (cached for performance)
 @st.cache_resource
 def get_classifier():
-    return ClothingClassifier()
+    # Imported lazily: pulls in torch/transformers, which DB-only pages never need
+    from classifier import get_classifier as _get
+    return _get()
+
+@st.cache_resource
+def get_executor():
+    """Background workers so classification doesn't block the UI thread"""
+    return ThreadPoolExecutor(max_workers=2)
+
+@st.cache_resource
+def _classification_results():
+    """Classification results keyed by image hash - re-uploads skip inference"""
+    return {}
 
 @st.cache_resource
 def get_weather_service():
+    from weather import WeatherService
     return WeatherService()
 
+@st.cache_data(ttl=600, show_spinner=False)
 def get_weather():
-    """Get weather with emoji (uses DEFAULT_CITY from .env)"""
+    """Get weather with emoji (uses DEFAULT_CITY from .env), refreshed every 10 min"""
     ws = get_weather_service()
     weather = ws.get_weather()  # Uses default city from env
     weather['emoji'] = ws.get_weather_icon_emoji(weather.get('condition', 'Clear'))
     return weather
 
-recommender = OutfitRecommender(DB_PATH)
-profile_manager = StyleProfileManager(DB_PATH)
+@st.cache_resource
+def get_recommender():
+    from recommender import OutfitRecommender
+    return OutfitRecommender(DB_PATH)
+
+@st.cache_resource
+def get_profile_manager():
+    from profile import StyleProfileManager
+    return StyleProfileManager(DB_PATH)
 
 # ==================== DATABASE FUNCTIONS ====================
 
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
+@st.cache_resource
+def get_conn():
+    """Single long-lived connection shared across reruns (avoids connect/close per helper)"""
+    # cached_statements keeps prepared statements around; helpers use stable
+    # SQL text so short queries skip the parse/prepare step on repeat calls
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row  # This returns dict-like rows
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-64000')  # 64 MB page cache kept warm across reruns
     return conn
 
+def get_db():
+    return get_conn()
+
+def wardrobe_version():
+    """Current wardrobe version - used as a cache key for cached reads"""
+    return st.session_state.setdefault('wardrobe_v', 0)
+
+def bump_wardrobe_version():
+    """Bump after any write so cached reads refresh on the next rerun"""
+    st.session_state['wardrobe_v'] = st.session_state.get('wardrobe_v', 0) + 1
+
+SCHEMA_VERSION = 5
+
+# Whitelisted ORDER BY clauses for the wardrobe grid
+CLOTHES_ORDERINGS = {
+    'newest': 'created_ts DESC',
+    'most_worn': 'times_worn DESC',
+    'least_worn': 'times_worn ASC',
+}
+
+@st.cache_resource
 def init_db():
-    """Initialize database with proper schema"""
+    """Initialize database once per process (migrations gated by user_version)"""
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    
+
+    # Schema already migrated? Then startup is a single pragma read
+    c.execute('PRAGMA user_version')
+    version = c.fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        conn.close()
+        return
+
     # Create clothes table with correct schema
     c.execute('''
         CREATE TABLE IF NOT EXISTS clothes (
@@ -80,7 +188,8 @@ def init_db():
         )
     ''')
     
-    # Add missing columns to existing tables (migration)
+    # Add missing columns to existing tables (migration) - diff against
+    # table_info once instead of probing with try/except ALTERs
     migrations = [
         ('times_worn', 'INTEGER DEFAULT 0'),
         ('last_worn', 'TEXT'),
@@ -89,12 +198,11 @@ def init_db():
         ('season_weight', 'TEXT DEFAULT "medium"'),
         ('pattern', 'TEXT DEFAULT "solid"')
     ]
-    
+
+    existing_cols = {row[1] for row in c.execute('PRAGMA table_info(clothes)')}
     for col_name, col_type in migrations:
-        try:
+        if col_name not in existing_cols:
             c.execute(f'ALTER TABLE clothes ADD COLUMN {col_name} {col_type}')
-        except sqlite3.OperationalError:
-            pass  # Column already exists
     
     # Initialize NULL values to defaults
     c.execute('UPDATE clothes SET times_worn = 0 WHERE times_worn IS NULL')
@@ -117,92 +225,239 @@ def init_db():
             worn_at TEXT
         )
     ''')
-    
+
+    # Indexes for the hot filters/sorts (wardrobe grid, forgotten items, history)
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_clothes_type_laundry_created
+                 ON clothes(clothing_type, in_laundry, created_at DESC)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_clothes_forgotten
+                 ON clothes(in_laundry, last_worn, times_worn)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_outfits_worn_at
+                 ON outfits(worn_at DESC)''')
+
+    # v2: integer Unix timestamps so date filters/sorts compare integers
+    # instead of ISO strings (the TEXT columns stay for the FastAPI backend)
+    if version < 2:
+        for col in ('last_worn_ts', 'created_ts'):
+            if col not in existing_cols:
+                c.execute(f'ALTER TABLE clothes ADD COLUMN {col} INTEGER')
+        c.execute('''UPDATE clothes SET last_worn_ts = CAST(strftime('%s', last_worn) AS INTEGER)
+                     WHERE last_worn IS NOT NULL AND last_worn_ts IS NULL''')
+        c.execute('''UPDATE clothes SET created_ts = CAST(strftime('%s', created_at) AS INTEGER)
+                     WHERE created_at IS NOT NULL AND created_ts IS NULL''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_clothes_created_ts
+                     ON clothes(created_ts DESC)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_clothes_forgotten_ts
+                     ON clothes(in_laundry, last_worn_ts, times_worn)''')
+
+    # v4: index for the Most/Least Worn sort orders
+    if version < 4:
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_clothes_times_worn
+                     ON clothes(times_worn)''')
+
+    # v5: partial index covering the Laundry page query - only rows actually
+    # in the basket are indexed, already in its display order
+    if version < 5:
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_clothes_laundry
+                     ON clothes(last_worn_ts DESC) WHERE in_laundry = 1''')
+
+    # v3: single-row counters table kept current by triggers, so the sidebar
+    # stats read is O(1) instead of a full table scan
+    if version < 3:
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS counters (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total INTEGER NOT NULL DEFAULT 0,
+                in_laundry INTEGER NOT NULL DEFAULT 0,
+                favorites INTEGER NOT NULL DEFAULT 0,
+                never_worn INTEGER NOT NULL DEFAULT 0,
+                total_outfits INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS counters_clothes_ins AFTER INSERT ON clothes BEGIN
+                UPDATE counters SET
+                    total = total + 1,
+                    in_laundry = in_laundry + (COALESCE(NEW.in_laundry, 0) = 1),
+                    favorites = favorites + (COALESCE(NEW.favorite, 0) = 1),
+                    never_worn = never_worn + (COALESCE(NEW.times_worn, 0) = 0)
+                WHERE id = 1;
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS counters_clothes_del AFTER DELETE ON clothes BEGIN
+                UPDATE counters SET
+                    total = total - 1,
+                    in_laundry = in_laundry - (COALESCE(OLD.in_laundry, 0) = 1),
+                    favorites = favorites - (COALESCE(OLD.favorite, 0) = 1),
+                    never_worn = never_worn - (COALESCE(OLD.times_worn, 0) = 0)
+                WHERE id = 1;
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS counters_clothes_upd
+            AFTER UPDATE OF in_laundry, favorite, times_worn ON clothes BEGIN
+                UPDATE counters SET
+                    in_laundry = in_laundry + (COALESCE(NEW.in_laundry, 0) = 1) - (COALESCE(OLD.in_laundry, 0) = 1),
+                    favorites = favorites + (COALESCE(NEW.favorite, 0) = 1) - (COALESCE(OLD.favorite, 0) = 1),
+                    never_worn = never_worn + (COALESCE(NEW.times_worn, 0) = 0) - (COALESCE(OLD.times_worn, 0) = 0)
+                WHERE id = 1;
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS counters_outfits_ins AFTER INSERT ON outfits BEGIN
+                UPDATE counters SET total_outfits = total_outfits + 1 WHERE id = 1;
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS counters_outfits_del AFTER DELETE ON outfits BEGIN
+                UPDATE counters SET total_outfits = total_outfits - 1 WHERE id = 1;
+            END
+        ''')
+        # Seed from the current data; triggers keep it in sync from here on
+        c.execute('''
+            INSERT OR REPLACE INTO counters (id, total, in_laundry, favorites, never_worn, total_outfits)
+            SELECT 1, COUNT(*),
+                   COALESCE(SUM(in_laundry = 1), 0),
+                   COALESCE(SUM(favorite = 1), 0),
+                   COALESCE(SUM(times_worn = 0 OR times_worn IS NULL), 0),
+                   (SELECT COUNT(*) FROM outfits)
+            FROM clothes
+        ''')
+
+    c.execute('ANALYZE')
+
+    c.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
     conn.commit()
     conn.close()
 
 def get_wardrobe_stats():
-    """Get wardrobe statistics"""
-    conn = get_db()
+    """Get wardrobe statistics (single scan of clothes instead of one query per counter)"""
+    return _stats_query(get_db())
+
+def _stats_query(conn):
     c = conn.cursor()
     stats = {}
-    
-    c.execute('SELECT COUNT(*) FROM clothes')
-    stats['total'] = c.fetchone()[0]
-    
+
+    # Counters row is maintained by triggers - O(1) read, no table scan
+    c.execute('SELECT total, in_laundry, favorites, never_worn, total_outfits FROM counters WHERE id = 1')
+    row = c.fetchone()
+    stats['total'] = row['total']
+    stats['in_laundry'] = row['in_laundry']
+    stats['favorites'] = row['favorites']
+    stats['never_worn'] = row['never_worn']
+    stats['total_outfits'] = row['total_outfits']
+
     c.execute('SELECT clothing_type, COUNT(*) FROM clothes GROUP BY clothing_type')
     stats['by_type'] = dict(c.fetchall())
-    
-    c.execute('SELECT COUNT(*) FROM clothes WHERE in_laundry = 1')
-    stats['in_laundry'] = c.fetchone()[0]
-    
-    c.execute('SELECT COUNT(*) FROM clothes WHERE favorite = 1')
-    stats['favorites'] = c.fetchone()[0]
-    
-    c.execute('SELECT COUNT(*) FROM clothes WHERE times_worn = 0 OR times_worn IS NULL')
-    stats['never_worn'] = c.fetchone()[0]
-    
-    c.execute('SELECT COUNT(*) FROM outfits')
-    stats['total_outfits'] = c.fetchone()[0]
-    
-    conn.close()
+
     return stats
 
-def get_clothes(clothing_type=None, exclude_laundry=False):
-    """Get all clothes with proper filtering"""
+def get_clothes(clothing_type=None, exclude_laundry=False, limit=None, offset=0):
+    """Get all clothes with proper filtering (cached until the wardrobe changes)"""
+    return _get_clothes_cached(clothing_type, exclude_laundry, limit, offset, wardrobe_version())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _get_clothes_cached(clothing_type, exclude_laundry, limit, offset, version):
     conn = get_db()
     c = conn.cursor()
-    
-    query = 'SELECT * FROM clothes WHERE 1=1'
+
+    # Defaults applied in SQL so rows come back ready to use
+    query = '''SELECT id, image_path, clothing_type, color_primary, color_secondary,
+                      COALESCE(pattern, 'solid') AS pattern,
+                      COALESCE(formality, 'casual') AS formality,
+                      COALESCE(season_weight, 'medium') AS season_weight,
+                      COALESCE(times_worn, 0) AS times_worn,
+                      last_worn,
+                      COALESCE(in_laundry, 0) AS in_laundry,
+                      COALESCE(favorite, 0) AS favorite,
+                      created_at
+               FROM clothes WHERE 1=1'''
     params = []
-    
+
     if clothing_type and clothing_type != "All":
         query += ' AND clothing_type = ?'
         params.append(clothing_type)
-    
+
     if exclude_laundry:
         query += ' AND (in_laundry = 0 OR in_laundry IS NULL)'
-    
-    query += ' ORDER BY created_at DESC'
+
+    query += ' ORDER BY created_ts DESC'
+
+    if limit is not None:
+        query += ' LIMIT ? OFFSET ?'
+        params.extend([limit, offset])
+
     c.execute(query, params)
-    
-    # Convert to proper dict using column names
-    clothes = []
-    for row in c.fetchall():
-        clothes.append({
-            'id': row['id'],
-            'image_path': row['image_path'],
-            'clothing_type': row['clothing_type'],
-            'color_primary': row['color_primary'],
-            'color_secondary': row['color_secondary'],
-            'pattern': row['pattern'] or 'solid',
-            'formality': row['formality'] or 'casual',
-            'season_weight': row['season_weight'] or 'medium',
-            'times_worn': row['times_worn'] or 0,
-            'last_worn': row['last_worn'],
-            'in_laundry': row['in_laundry'] or 0,
-            'favorite': row['favorite'] or 0,
-            'created_at': row['created_at']
-        })
-    
-    conn.close()
-    return clothes
+
+    # dict(row) is a single C-level copy; plain dicts keep the result picklable
+    return [dict(row) for row in c.fetchall()]
+
+def get_clothes_df(clothing_type=None, exclude_laundry=False, limit=None, order='newest'):
+    """Wardrobe rows as a DataFrame - column-wise, cheap to sort and cache"""
+    return _get_clothes_df_cached(clothing_type, exclude_laundry, limit, order, wardrobe_version())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _get_clothes_df_cached(clothing_type, exclude_laundry, limit, order, version):
+    conn = get_db()
+
+    query = '''SELECT id, image_path, clothing_type, times_worn, in_laundry, favorite
+               FROM clothes WHERE 1=1'''
+    params = []
+
+    if clothing_type and clothing_type != "All":
+        query += ' AND clothing_type = ?'
+        params.append(clothing_type)
+
+    if exclude_laundry:
+        query += ' AND (in_laundry = 0 OR in_laundry IS NULL)'
+
+    # Sort in SQL where an index can serve it (keys validated by whitelist)
+    query += f" ORDER BY {CLOTHES_ORDERINGS.get(order, CLOTHES_ORDERINGS['newest'])}"
+
+    if limit is not None:
+        query += ' LIMIT ?'
+        params.append(limit)
+
+    return pd.read_sql_query(query, conn, params=params)
+
+def get_laundry_items():
+    """Get items currently in the laundry basket (cached until the wardrobe changes)"""
+    return _get_laundry_cached(wardrobe_version())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _get_laundry_cached(version):
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('''
+        SELECT id, image_path, clothing_type
+        FROM clothes
+        WHERE in_laundry = 1
+        ORDER BY last_worn_ts DESC
+    ''')
+    # Plain dicts so st.cache_data can pickle the result
+    return [{'id': r['id'], 'image_path': r['image_path'], 'clothing_type': r['clothing_type']}
+            for r in c.fetchall()]
 
 def set_laundry(item_id, in_laundry):
     """Set laundry status explicitly"""
     conn = get_db()
-    c = conn.cursor()
-    c.execute('UPDATE clothes SET in_laundry = ? WHERE id = ?', (1 if in_laundry else 0, item_id))
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute('UPDATE clothes SET in_laundry = ? WHERE id = ?', (1 if in_laundry else 0, item_id))
+    bump_wardrobe_version()
+
+def clear_laundry():
+    """Mark every laundry item clean in a single statement"""
+    conn = get_db()
+    with conn:
+        conn.execute('UPDATE clothes SET in_laundry = 0 WHERE in_laundry = 1')
+    bump_wardrobe_version()
 
 def set_favorite(item_id, favorite):
     """Set favorite status explicitly"""
     conn = get_db()
-    c = conn.cursor()
-    c.execute('UPDATE clothes SET favorite = ? WHERE id = ?', (1 if favorite else 0, item_id))
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute('UPDATE clothes SET favorite = ? WHERE id = ?', (1 if favorite else 0, item_id))
+    bump_wardrobe_version()
 
 def delete_clothing(item_id):
     """Delete a clothing item"""
@@ -213,133 +468,143 @@ def delete_clothing(item_id):
     if row and row['image_path'] and os.path.exists(row['image_path']):
         try:
             os.remove(row['image_path'])
+            thumb_path = f"{os.path.splitext(row['image_path'])[0]}_thumb.webp"
+            if os.path.exists(thumb_path):
+                os.remove(thumb_path)
         except:
             pass
-    c.execute('DELETE FROM clothes WHERE id = ?', (item_id,))
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute('DELETE FROM clothes WHERE id = ?', (item_id,))
+    _existing_images.clear()
+    bump_wardrobe_version()
 
 def save_clothing(image_path, data):
     """Save a new clothing item"""
     conn = get_db()
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO clothes (image_path, clothing_type, color_primary, color_secondary, 
-                           pattern, formality, season_weight, times_worn, in_laundry, favorite, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0, 0, ?)
-    ''', (
-        image_path, 
-        data['type'], 
-        data['color_primary'], 
-        data.get('color_secondary'),
-        data.get('pattern', 'solid'), 
-        data['formality'], 
-        data.get('season_weight', 'medium'),
-        datetime.now().isoformat()
-    ))
-    conn.commit()
-    conn.close()
+    now = datetime.now()
+    with conn:
+        conn.execute('''
+            INSERT INTO clothes (image_path, clothing_type, color_primary, color_secondary,
+                               pattern, formality, season_weight, times_worn, in_laundry, favorite,
+                               created_at, created_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?)
+        ''', (
+            image_path,
+            data['type'],
+            data['color_primary'],
+            data.get('color_secondary'),
+            data.get('pattern', 'solid'),
+            data['formality'],
+            data.get('season_weight', 'medium'),
+            now.isoformat(),
+            int(now.timestamp())
+        ))
+    _existing_images.clear()
+    bump_wardrobe_version()
 
 def log_outfit(outfit, occasion, weather):
     """Log a worn outfit and update times_worn"""
     conn = get_db()
-    c = conn.cursor()
-    
+
     # Get item IDs from outfit
     top_id = outfit.get('top', {}).get('id') if outfit.get('type') == 'regular' else None
     bottom_id = outfit.get('bottom', {}).get('id') if outfit.get('type') == 'regular' else None
     shoes_id = outfit.get('shoes', {}).get('id') if outfit.get('shoes') else None
     dress_id = outfit.get('dress', {}).get('id') if outfit.get('type') == 'dress' else None
-    
-    # Insert outfit record
-    c.execute('''
-        INSERT INTO outfits (top_id, bottom_id, shoes_id, dress_id, occasion, weather_temp, weather_condition, worn_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (top_id, bottom_id, shoes_id, dress_id, occasion, 
-          weather.get('temp'), weather.get('condition'), datetime.now().isoformat()))
-    
-    outfit_id = c.lastrowid
-    
-    # Update times_worn for each item
-    now = datetime.now().isoformat()
-    for item_id in [top_id, bottom_id, shoes_id, dress_id]:
-        if item_id:
-            c.execute('''
-                UPDATE clothes 
-                SET times_worn = COALESCE(times_worn, 0) + 1, last_worn = ? 
-                WHERE id = ?
-            ''', (now, item_id))
-    
-    conn.commit()
-    conn.close()
+
+    # One transaction (and one fsync) covers the insert and the wear update
+    with conn:
+        c = conn.cursor()
+        c.execute('''
+            INSERT INTO outfits (top_id, bottom_id, shoes_id, dress_id, occasion, weather_temp, weather_condition, worn_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (top_id, bottom_id, shoes_id, dress_id, occasion, 
+              weather.get('temp'), weather.get('condition'), datetime.now().isoformat()))
+
+        outfit_id = c.lastrowid
+
+        # Update times_worn for all items in one statement
+        now = datetime.now()
+        item_ids = [i for i in (top_id, bottom_id, shoes_id, dress_id) if i]
+        if item_ids:
+            placeholders = ','.join('?' * len(item_ids))
+            c.execute(f'''
+                UPDATE clothes
+                SET times_worn = COALESCE(times_worn, 0) + 1, last_worn = ?, last_worn_ts = ?
+                WHERE id IN ({placeholders})
+            ''', (now.isoformat(), int(now.timestamp()), *item_ids))
+
+    bump_wardrobe_version()
     return outfit_id
 
 def get_outfit_history(limit=10):
-    """Get outfit history with images"""
+    """Get outfit history with images (only the columns the History page reads)"""
+    return _get_history_cached(limit, wardrobe_version())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _get_history_cached(limit, version):
     conn = get_db()
     c = conn.cursor()
     c.execute('''
-        SELECT o.*, 
-               t.image_path as top_img, 
+        SELECT strftime('%Y-%m-%d %H:%M', o.worn_at) AS worn_pretty,
+               o.occasion, o.weather_temp, o.weather_condition,
+               t.image_path as top_img,
                b.image_path as bottom_img,
-               s.image_path as shoes_img, 
+               s.image_path as shoes_img,
                d.image_path as dress_img
         FROM outfits o
         LEFT JOIN clothes t ON o.top_id = t.id
         LEFT JOIN clothes b ON o.bottom_id = b.id
         LEFT JOIN clothes s ON o.shoes_id = s.id
         LEFT JOIN clothes d ON o.dress_id = d.id
-        ORDER BY o.worn_at DESC 
+        ORDER BY o.worn_at DESC
         LIMIT ?
     ''', (limit,))
-    
-    history = []
-    for row in c.fetchall():
-        history.append({
-            'id': row['id'],
-            'top_id': row['top_id'],
-            'bottom_id': row['bottom_id'],
-            'shoes_id': row['shoes_id'],
-            'dress_id': row['dress_id'],
-            'occasion': row['occasion'],
-            'weather_temp': row['weather_temp'],
-            'weather_condition': row['weather_condition'],
-            'worn_at': row['worn_at'],
-            'top_img': row['top_img'],
-            'bottom_img': row['bottom_img'],
-            'shoes_img': row['shoes_img'],
-            'dress_img': row['dress_img']
-        })
-    
-    conn.close()
-    return history
+
+    # Plain dicts so st.cache_data can pickle the result
+    return [dict(r) for r in c.fetchall()]
 
 def get_forgotten_items():
     """Get items not worn in 30+ days"""
-    conn = get_db()
+    return _forgotten_query(get_db())
+
+def _forgotten_query(conn):
     c = conn.cursor()
-    thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-    
+    thirty_days_ago = int((datetime.now() - timedelta(days=30)).timestamp())
+
     c.execute('''
-        SELECT * FROM clothes 
-        WHERE (last_worn < ? OR last_worn IS NULL) 
+        SELECT id, image_path, clothing_type,
+               COALESCE(times_worn, 0) AS times_worn, last_worn
+        FROM clothes
+        WHERE (last_worn_ts < ? OR last_worn_ts IS NULL)
         AND (in_laundry = 0 OR in_laundry IS NULL)
-        ORDER BY times_worn ASC 
+        ORDER BY times_worn ASC
         LIMIT 5
     ''', (thirty_days_ago,))
-    
-    items = []
-    for row in c.fetchall():
-        items.append({
-            'id': row['id'],
-            'image_path': row['image_path'],
-            'clothing_type': row['clothing_type'],
-            'times_worn': row['times_worn'] or 0,
-            'last_worn': row['last_worn']
-        })
-    
-    conn.close()
-    return items
+
+    return [dict(row) for row in c.fetchall()]
+
+def _wipe_images():
+    """Delete every wardrobe image with one directory walk (testing tools)"""
+    try:
+        for entry in os.scandir(IMAGES_DIR):
+            if entry.is_file():
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
+    except FileNotFoundError:
+        pass
+    _existing_images.clear()
+
+def home_bundle():
+    """Stats + forgotten items for the Home page in one cached, shared-connection trip"""
+    return _home_bundle_cached(wardrobe_version())
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _home_bundle_cached(version):
+    conn = get_db()
+    return {'stats': _stats_query(conn), 'forgotten': _forgotten_query(conn)}
 
 # ==================== INITIALIZE ====================
 init_db()
@@ -352,16 +617,23 @@ page = st.sidebar.radio(
     ["🏠 Home", "➕ Add Clothes", "👕 Wardrobe", "✨ Get Outfit", "🧺 Laundry", "📊 Insights", "📜 History"]
 )
 
-# Quick stats in sidebar
-stats = get_wardrobe_stats()
-st.sidebar.divider()
-st.sidebar.metric("Total Clothes", stats['total'])
-st.sidebar.metric("In Laundry", stats['in_laundry'])
+# Quick stats in sidebar (fragment so plain widget clicks don't recompute it)
+@st.fragment
+def sidebar_stats():
+    stats = get_wardrobe_stats()
+    st.sidebar.divider()
+    st.sidebar.metric("Total Clothes", stats['total'])
+    st.sidebar.metric("In Laundry", stats['in_laundry'])
+
+sidebar_stats()
 
 # ==================== HOME PAGE ====================
 if page == "🏠 Home":
     st.title("👔 AI Outfit - Home")
-    
+
+    bundle = home_bundle()
+    stats = bundle['stats']
+
     # Weather
     weather = get_weather()
     col1, col2, col3 = st.columns(3)
@@ -389,14 +661,14 @@ if page == "🏠 Home":
     st.divider()
     
     # Forgotten items
-    forgotten = get_forgotten_items()
+    forgotten = bundle['forgotten']
     if forgotten:
         st.subheader("🔔 Not Worn in 30+ Days")
         cols = st.columns(min(len(forgotten), 5))
         for i, item in enumerate(forgotten[:5]):
             with cols[i]:
-                if item['image_path'] and os.path.exists(item['image_path']):
-                    st.image(item['image_path'], caption=item['clothing_type'].title(), use_column_width=True)
+                if img_ok(item['image_path']):
+                    render_image(item['image_path'], caption=item['clothing_type'].title(), thumb=True)
 
 # ==================== ADD CLOTHES ====================
 elif page == "➕ Add Clothes":
@@ -410,34 +682,61 @@ elif page == "➕ Add Clothes":
         uploaded_file = st.file_uploader("Choose an image", type=['jpg', 'jpeg', 'png'])
     
     if uploaded_file:
-        os.makedirs('wardrobe_images', exist_ok=True)
-        image_path = f"wardrobe_images/{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-        
-        with open(image_path, 'wb') as f:
-            f.write(uploaded_file.getvalue())
-        
+        img_hash = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+        # Save each upload once, keyed on content hash (reruns reuse the file)
+        if st.session_state.get('upload_hash') != img_hash:
+            os.makedirs(IMAGES_DIR, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            image_path = f"{IMAGES_DIR}/{stamp}.webp"
+
+            # Downscale and re-encode - raw camera captures can be several MB
+            img = Image.open(uploaded_file).convert('RGB')
+            img.thumbnail((800, 800), Image.LANCZOS)
+            img.save(image_path, 'WEBP', quality=80, method=4)
+
+            # Small thumbnail for the grid views
+            thumb = img.copy()
+            thumb.thumbnail((200, 200), Image.LANCZOS)
+            thumb.save(f"{IMAGES_DIR}/{stamp}_thumb.webp", 'WEBP', quality=80, method=4)
+
+            st.session_state['upload_hash'] = img_hash
+            st.session_state['upload_path'] = image_path
+
+        image_path = st.session_state['upload_path']
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
-            st.image(image_path, caption="Preview", use_column_width=True)
-        
+            render_image(image_path, caption="Preview")
+
         with col2:
-            with st.spinner("🤖 AI analyzing..."):
-                classifier = get_classifier()
-                result = classifier.classify_full(image_path)
-            
+            # Run classification on the background executor and poll, so the
+            # upload doesn't freeze the app; identical images hit the cache
+            results = _classification_results()
+            if img_hash in results:
+                result = results[img_hash]
+            else:
+                future = st.session_state.get('clf_future')
+                if future is None or st.session_state.get('clf_hash') != img_hash:
+                    future = get_executor().submit(get_classifier().classify_full, image_path)
+                    st.session_state['clf_future'] = future
+                    st.session_state['clf_hash'] = img_hash
+
+                if not future.done():
+                    with st.spinner("🤖 AI analyzing..."):
+                        time.sleep(0.5)
+                    st.rerun()
+
+                result = future.result()
+                results[img_hash] = result
+                st.session_state['clf_future'] = None
+
             if result.get('success'):
                 st.success(f"✅ Detected: {result.get('clothing_type', 'Unknown').title()}")
                 
                 # Map to category
-                type_map = {
-                    't-shirt': 'top', 'shirt': 'top', 'blouse': 'top', 'sweater': 'top', 'hoodie': 'top',
-                    'jeans': 'bottom', 'trousers': 'bottom', 'pants': 'bottom', 'shorts': 'bottom', 'skirt': 'bottom',
-                    'dress': 'dress', 'jumpsuit': 'dress',
-                    'sneakers': 'shoes', 'formal shoes': 'shoes', 'boots': 'shoes', 'sandals': 'shoes',
-                    'jacket': 'outerwear', 'coat': 'outerwear', 'blazer': 'outerwear', 'cardigan': 'outerwear'
-                }
-                detected_type = type_map.get(result.get('clothing_type', '').lower(), 'top')
+                detected_type = TYPE_MAP.get(result.get('clothing_type', '').lower(), 'top')
                 detected_formality = result.get('formality', 'casual')
                 detected_pattern = result.get('pattern', 'solid')
                 detected_color = result.get('color_primary', '#000000')
@@ -450,9 +749,8 @@ elif page == "➕ Add Clothes":
             
             st.subheader("Confirm Details")
             
-            type_options = ["top", "bottom", "dress", "shoes", "outerwear"]
-            clothing_type = st.selectbox("Type", type_options, 
-                                        index=type_options.index(detected_type) if detected_type in type_options else 0)
+            clothing_type = st.selectbox("Type", TYPE_OPTIONS,
+                                        index=TYPE_IDX.get(detected_type, 0))
             
             col_a, col_b = st.columns(2)
             with col_a:
@@ -460,13 +758,11 @@ elif page == "➕ Add Clothes":
             with col_b:
                 color_secondary = st.color_picker("Secondary Color", '#ffffff')
             
-            formality_options = ["casual", "business-casual", "formal", "athletic"]
-            formality = st.selectbox("Formality", formality_options,
-                                    index=formality_options.index(detected_formality) if detected_formality in formality_options else 0)
-            
-            pattern_options = ["solid", "striped", "checkered", "floral", "printed"]
-            pattern = st.selectbox("Pattern", pattern_options,
-                                  index=pattern_options.index(detected_pattern) if detected_pattern in pattern_options else 0)
+            formality = st.selectbox("Formality", FORMALITY_OPTIONS,
+                                    index=FORMALITY_IDX.get(detected_formality, 0))
+
+            pattern = st.selectbox("Pattern", PATTERN_OPTIONS,
+                                  index=PATTERN_IDX.get(detected_pattern, 0))
             
             season_weight = st.selectbox("Weight", ["light", "medium", "heavy"], index=1)
             
@@ -494,58 +790,69 @@ elif page == "👕 Wardrobe":
     with col3:
         sort_by = st.selectbox("Sort by", ["Newest", "Most Worn", "Least Worn"])
     
-    # Get clothes with proper filtering
-    clothes = get_clothes(
-        clothing_type=filter_type if filter_type != "All" else None, 
-        exclude_laundry=not show_laundry
-    )
-    
-    # Sort
-    if sort_by == "Most Worn":
-        clothes.sort(key=lambda x: x.get('times_worn', 0) or 0, reverse=True)
-    elif sort_by == "Least Worn":
-        clothes.sort(key=lambda x: x.get('times_worn', 0) or 0)
-    
-    if not clothes:
-        st.info("No clothes found. Add some!")
-    else:
-        st.caption(f"Showing {len(clothes)} items")
-        
+    # Grid runs as a fragment: a toggle re-renders just the grid, not the
+    # whole script (sidebar, init, other pages)
+    @st.fragment
+    def wardrobe_grid(filter_type, show_laundry, sort_by):
+        PAGE_SIZE = 24
+        pages = st.session_state.get('wardrobe_pages', 1)
+        sort_orders = {"Newest": 'newest', "Most Worn": 'most_worn', "Least Worn": 'least_worn'}
+        df = get_clothes_df(
+            clothing_type=filter_type if filter_type != "All" else None,
+            exclude_laundry=not show_laundry,
+            limit=pages * PAGE_SIZE,
+            order=sort_orders[sort_by]
+        )
+
+        if df.empty:
+            st.info("No clothes found. Add some!")
+            return
+
+        st.caption(f"Showing {len(df)} items")
+
         cols = st.columns(4)
-        for i, item in enumerate(clothes):
+        for i, item in enumerate(df.itertuples()):
             with cols[i % 4]:
-                if item['image_path'] and os.path.exists(item['image_path']):
-                    st.image(item['image_path'], use_column_width=True)
-                
-                st.write(f"**{item['clothing_type'].title()}**")
-                
+                if img_ok(item.image_path):
+                    render_image(item.image_path, thumb=True)
+
+                st.write(f"**{item.clothing_type.title()}**")
+
                 # Status indicators
-                status_parts = [f"Worn {item.get('times_worn', 0)}x"]
-                if item.get('in_laundry'):
+                status_parts = [f"Worn {item.times_worn or 0}x"]
+                if item.in_laundry:
                     status_parts.append("🧺 In Laundry")
-                if item.get('favorite'):
+                if item.favorite:
                     status_parts.append("❤️")
                 st.caption(" | ".join(status_parts))
-                
-                # Action buttons
+
+                # Action buttons (scoped rerun: only the grid refreshes)
                 col_a, col_b, col_c = st.columns(3)
                 with col_a:
-                    fav_label = "💔" if item.get('favorite') else "❤️"
-                    if st.button(fav_label, key=f"fav_{item['id']}", help="Toggle Favorite"):
-                        set_favorite(item['id'], not item.get('favorite'))
-                        st.rerun()
+                    fav_label = "💔" if item.favorite else "❤️"
+                    if st.button(fav_label, key=f"fav_{item.id}", help="Toggle Favorite"):
+                        set_favorite(int(item.id), not item.favorite)
+                        st.rerun(scope="fragment")
                 with col_b:
-                    laundry_label = "✅" if item.get('in_laundry') else "🧺"
-                    if st.button(laundry_label, key=f"laundry_{item['id']}", help="Toggle Laundry"):
-                        set_laundry(item['id'], not item.get('in_laundry'))
-                        st.rerun()
+                    laundry_label = "✅" if item.in_laundry else "🧺"
+                    if st.button(laundry_label, key=f"laundry_{item.id}", help="Toggle Laundry"):
+                        set_laundry(int(item.id), not item.in_laundry)
+                        st.rerun(scope="fragment")
                 with col_c:
-                    if st.button("🗑️", key=f"del_{item['id']}", help="Delete"):
-                        delete_clothing(item['id'])
-                        st.rerun()
-                
+                    if st.button("🗑️", key=f"del_{item.id}", help="Delete"):
+                        delete_clothing(int(item.id))
+                        st.rerun(scope="fragment")
+
                 st.divider()
 
+        # Only render more items when the user asks for them
+        if len(df) == pages * PAGE_SIZE:
+            if st.button("⬇️ Load More"):
+                st.session_state['wardrobe_pages'] = pages + 1
+                st.rerun(scope="fragment")
+
+    wardrobe_grid(filter_type, show_laundry, sort_by)
+
 # ==================== GET OUTFIT ====================
 elif page == "✨ Get Outfit":
     st.title("✨ Get Outfit Suggestions")
@@ -561,7 +868,7 @@ elif page == "✨ Get Outfit":
     
     if st.button("✨ Generate Outfits", type="primary"):
         with st.spinner("Finding perfect outfits..."):
-            suggestions = recommender.get_suggestions(occasion, weather, num_suggestions)
+            suggestions = get_recommender().get_suggestions(occasion, weather, num_suggestions)
         
         if not suggestions:
             st.warning("Not enough clothes. Add at least 1 top, 1 bottom, and 1 pair of shoes!")
@@ -573,24 +880,24 @@ elif page == "✨ Get Outfit":
                     
                     if outfit.get('type') == 'regular':
                         cols = st.columns(3)
-                        if outfit.get('top') and outfit['top'].get('image_path') and os.path.exists(outfit['top']['image_path']):
+                        if outfit.get('top') and img_ok(outfit['top'].get('image_path')):
                             with cols[0]:
-                                st.image(outfit['top']['image_path'], caption="👕 Top", use_column_width=True)
-                        if outfit.get('bottom') and outfit['bottom'].get('image_path') and os.path.exists(outfit['bottom']['image_path']):
+                                render_image(outfit['top']['image_path'], caption="👕 Top")
+                        if outfit.get('bottom') and img_ok(outfit['bottom'].get('image_path')):
                             with cols[1]:
-                                st.image(outfit['bottom']['image_path'], caption="👖 Bottom", use_column_width=True)
-                        if outfit.get('shoes') and outfit['shoes'].get('image_path') and os.path.exists(outfit['shoes']['image_path']):
+                                render_image(outfit['bottom']['image_path'], caption="👖 Bottom")
+                        if outfit.get('shoes') and img_ok(outfit['shoes'].get('image_path')):
                             with cols[2]:
-                                st.image(outfit['shoes']['image_path'], caption="👟 Shoes", use_column_width=True)
+                                render_image(outfit['shoes']['image_path'], caption="👟 Shoes")
                     
                     elif outfit.get('type') == 'dress':
                         cols = st.columns(2)
-                        if outfit.get('dress') and outfit['dress'].get('image_path') and os.path.exists(outfit['dress']['image_path']):
+                        if outfit.get('dress') and img_ok(outfit['dress'].get('image_path')):
                             with cols[0]:
-                                st.image(outfit['dress']['image_path'], caption="👗 Dress", use_column_width=True)
-                        if outfit.get('shoes') and outfit['shoes'].get('image_path') and os.path.exists(outfit['shoes']['image_path']):
+                                render_image(outfit['dress']['image_path'], caption="👗 Dress")
+                        if outfit.get('shoes') and img_ok(outfit['shoes'].get('image_path')):
                             with cols[1]:
-                                st.image(outfit['shoes']['image_path'], caption="👠 Shoes", use_column_width=True)
+                                render_image(outfit['shoes']['image_path'], caption="👠 Shoes")
                     
                     if st.button(f"👍 Wear This", key=f"wear_{idx}"):
                         outfit_id = log_outfit(outfit, occasion, weather)
@@ -600,35 +907,40 @@ elif page == "✨ Get Outfit":
 elif page == "🧺 Laundry":
     st.title("🧺 Laundry Basket")
     
-    # Get ALL clothes and filter for laundry items
-    all_clothes = get_clothes(exclude_laundry=False)
-    laundry_items = [item for item in all_clothes if item.get('in_laundry')]
-    
-    if not laundry_items:
-        st.info("🧺 Laundry basket is empty!")
-        st.caption("Mark items as 'in laundry' from the Wardrobe page")
-    else:
+    # The basket is a fragment too - marking one item clean re-renders
+    # only this list
+    @st.fragment
+    def laundry_list():
+        # Ask SQL for just the laundry items instead of scanning the whole wardrobe
+        laundry_items = get_laundry_items()
+
+        if not laundry_items:
+            st.info("🧺 Laundry basket is empty!")
+            st.caption("Mark items as 'in laundry' from the Wardrobe page")
+            return
+
         st.write(f"**{len(laundry_items)} items** in laundry")
-        
+
         if st.button("✅ Mark All as Clean", type="primary"):
-            for item in laundry_items:
-                set_laundry(item['id'], False)
+            clear_laundry()
             st.success("All items marked clean!")
-            st.rerun()
-        
+            st.rerun(scope="fragment")
+
         st.divider()
-        
+
         cols = st.columns(4)
         for i, item in enumerate(laundry_items):
             with cols[i % 4]:
-                if item['image_path'] and os.path.exists(item['image_path']):
-                    st.image(item['image_path'], use_column_width=True)
+                if img_ok(item['image_path']):
+                    render_image(item['image_path'], thumb=True)
                 st.write(f"**{item['clothing_type'].title()}**")
                 if st.button("✅ Mark Clean", key=f"clean_{item['id']}"):
                     set_laundry(item['id'], False)
-                    st.rerun()
+                    st.rerun(scope="fragment")
                 st.divider()
 
+    laundry_list()
+
 # ==================== INSIGHTS ====================
 elif page == "📊 Insights":
     st.title("📊 Wardrobe Insights")
@@ -659,7 +971,7 @@ elif page == "📊 Insights":
     
     st.subheader("AI Learning Stats")
     try:
-        profile_stats = profile_manager.get_stats()
+        profile_stats = get_profile_manager().get_stats()
         col1, col2 = st.columns(2)
         with col1:
             st.metric("Outfits Rated", profile_stats.get('total_ratings', 0))
@@ -692,19 +1004,11 @@ elif page == "📊 Insights":
         with col1:
             if st.button("✅ Yes, Delete All Clothes", type="primary"):
                 conn = get_db()
-                c = conn.cursor()
-                # Get all image paths
-                c.execute('SELECT image_path FROM clothes')
-                for row in c.fetchall():
-                    if row['image_path'] and os.path.exists(row['image_path']):
-                        try:
-                            os.remove(row['image_path'])
-                        except:
-                            pass
-                # Delete all clothes
-                c.execute('DELETE FROM clothes')
+                # One directory walk instead of a stat+unlink per row
+                _wipe_images()
+                conn.execute('DELETE FROM clothes')
                 conn.commit()
-                conn.close()
+                bump_wardrobe_version()
                 st.session_state['confirm_clear_clothes'] = False
                 st.success("All clothes deleted!")
                 st.rerun()
@@ -720,28 +1024,21 @@ elif page == "📊 Insights":
         with col1:
             if st.button("✅ Yes, Delete Everything", type="primary"):
                 conn = get_db()
-                c = conn.cursor()
-                # Delete images
-                c.execute('SELECT image_path FROM clothes')
-                for row in c.fetchall():
-                    if row['image_path'] and os.path.exists(row['image_path']):
-                        try:
-                            os.remove(row['image_path'])
-                        except:
-                            pass
-                # Clear all tables
-                c.execute('DELETE FROM clothes')
-                c.execute('DELETE FROM outfits')
-                try:
-                    c.execute('DELETE FROM style_profile')
-                except:
-                    pass
+                _wipe_images()
+                # Clear all tables in one script (single transaction)
                 try:
-                    c.execute('DELETE FROM outfit_ratings')
-                except:
-                    pass
+                    conn.executescript('''
+                        DELETE FROM clothes;
+                        DELETE FROM outfits;
+                        DELETE FROM style_profile;
+                        DELETE FROM outfit_ratings;
+                    ''')
+                except sqlite3.OperationalError:
+                    # Profile tables may not exist yet
+                    conn.execute('DELETE FROM clothes')
+                    conn.execute('DELETE FROM outfits')
                 conn.commit()
-                conn.close()
+                bump_wardrobe_version()
                 st.session_state['confirm_clear_all'] = False
                 st.success("All data cleared!")
                 st.rerun()
@@ -760,34 +1057,28 @@ elif page == "📜 History":
         st.info("No outfit history yet. Wear some outfits!")
     else:
         for outfit in history:
-            worn_date = None
-            if outfit.get('worn_at'):
-                try:
-                    worn_date = datetime.fromisoformat(outfit['worn_at'])
-                except:
-                    pass
-            
-            date_str = worn_date.strftime("%B %d, %Y at %I:%M %p") if worn_date else "Unknown"
-            occasion = outfit.get('occasion', 'casual') or 'casual'
+            # Date already formatted by SQLite in the SELECT
+            date_str = outfit['worn_pretty'] or "Unknown"
+            occasion = outfit['occasion'] or 'casual'
             
             with st.expander(f"📅 {date_str} • {occasion.title()}"):
                 cols = st.columns(3)
                 
-                if outfit.get('top_img') and os.path.exists(outfit['top_img']):
+                if img_ok(outfit['top_img']):
                     with cols[0]:
-                        st.image(outfit['top_img'], caption="Top", use_column_width=True)
-                
-                if outfit.get('bottom_img') and os.path.exists(outfit['bottom_img']):
+                        render_image(outfit['top_img'], caption="Top")
+
+                if img_ok(outfit['bottom_img']):
                     with cols[1]:
-                        st.image(outfit['bottom_img'], caption="Bottom", use_column_width=True)
-                
-                if outfit.get('shoes_img') and os.path.exists(outfit['shoes_img']):
+                        render_image(outfit['bottom_img'], caption="Bottom")
+
+                if img_ok(outfit['shoes_img']):
                     with cols[2]:
-                        st.image(outfit['shoes_img'], caption="Shoes", use_column_width=True)
-                
-                if outfit.get('dress_img') and os.path.exists(outfit['dress_img']):
-                    st.image(outfit['dress_img'], caption="Dress", use_column_width=True)
-                
-                temp = outfit.get('weather_temp', '--')
-                condition = outfit.get('weather_condition', 'Unknown')
+                        render_image(outfit['shoes_img'], caption="Shoes")
+
+                if img_ok(outfit['dress_img']):
+                    render_image(outfit['dress_img'], caption="Dress")
+
+                temp = outfit['weather_temp'] if outfit['weather_temp'] is not None else '--'
+                condition = outfit['weather_condition'] or 'Unknown'
                 st.caption(f"Weather: {temp}°C, {condition}")
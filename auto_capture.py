@@ -10,63 +10,133 @@ import streamlit as st
 from PIL import Image
 import torch
 from transformers import CLIPProcessor, CLIPModel
-from sklearn.cluster import KMeans
 import numpy as np
 import time
 import os
 from datetime import datetime
 
+from classifier import CLIP_MODEL_ID
+
 st.set_page_config(page_title="Auto Capture", page_icon="📷", layout="wide")
 
+# ===== LABEL SETS =====
+DETECTION_LABELS = [
+    "a photo of clothing or a garment",
+    "a photo of a person wearing clothes",
+    "a photo of an empty room or background",
+    "a photo of a random object",
+    "a photo of furniture",
+    "a blurry or unclear photo"
+]
+
+CLOTHING_TYPES = ["t-shirt", "shirt", "jeans", "trousers", "shorts", "dress", 
+                  "sneakers", "formal shoes", "jacket", "sweater", "hoodie", "skirt"]
+TYPE_LABELS = [f"a photo of a {t}" for t in CLOTHING_TYPES]
+
 # ===== MODEL =====
 @st.cache_resource
 def load_model():
-    model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-    processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-    return model, processor
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = CLIPModel.from_pretrained(CLIP_MODEL_ID)
+    model.eval()
+    if device == "cuda":
+        # FP16 on tensor cores: half the bandwidth, ~2x the matmul rate
+        model = model.to(device).half()
+        # Compiled kernels pay off here because the input shape is fixed
+        try:
+            model = torch.compile(model, mode="reduce-overhead")
+        except Exception:
+            pass  # older torch or unsupported backend - run eager
+    elif os.getenv('CLIP_QUANTIZE', '1') != '0':
+        # Int8-quantize the linear layers for CPU inference (2-3x on the
+        # matmul-heavy towers); set CLIP_QUANTIZE=0 to keep FP32
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8)
+    processor = CLIPProcessor.from_pretrained(CLIP_MODEL_ID)
+
+    # The label sets are fixed, so their embeddings are too: encode them
+    # once here and the per-frame cost is just the image tower
+    # max_length padding gives the text tower a static shape, which the
+    # compiled CUDA path can specialize on instead of re-jitting
+    text_inputs = processor(text=DETECTION_LABELS + TYPE_LABELS,
+                            return_tensors="pt", padding='max_length',
+                            max_length=77, truncation=True)
+    text_inputs = {k: v.to(device) for k, v in text_inputs.items()}
+    with torch.inference_mode():
+        text_features = model.get_text_features(**text_inputs)
+    text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+
+    return model, processor, text_features
 
 # ===== DETECTION FUNCTIONS =====
-def is_clothing(model, processor, image, threshold=0.6):
-    """Check if image contains clothing"""
-    labels = [
-        "a photo of clothing or a garment",
-        "a photo of a person wearing clothes",
-        "a photo of an empty room or background",
-        "a photo of a random object",
-        "a photo of furniture",
-        "a blurry or unclear photo"
-    ]
-    
-    inputs = processor(text=labels, images=image, return_tensors="pt", padding=True)
-    with torch.no_grad():
-        probs = model(**inputs).logits_per_image.softmax(dim=1)[0]
-    
+def dhash(image):
+    """64-bit difference hash - cheap fingerprint to spot repeated frames."""
+    g = np.asarray(image.convert('L').resize((9, 8), Image.Resampling.BILINEAR))
+    bits = (g[:, 1:] > g[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def classify_frame(model, processor, text_features, image, threshold=0.6):
+    """Detection + type classification from one image encode.
+
+    Text embeddings for both label groups are precomputed at model load;
+    each frame only runs the image encoder, then a cosine-similarity
+    matmul and a softmax per label group.
+    """
+    inputs = processor(images=image, return_tensors="pt")
+    inputs = {k: v.to(text_features.device) for k, v in inputs.items()}
+    if text_features.dtype == torch.float16:
+        inputs['pixel_values'] = inputs['pixel_values'].half()
+    with torch.inference_mode():
+        image_features = model.get_image_features(**inputs)
+        image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+        logits = (image_features @ text_features.T * model.logit_scale.exp())[0]
+
+    det_probs = logits[:len(DETECTION_LABELS)].softmax(dim=0)
+    type_probs = logits[len(DETECTION_LABELS):].softmax(dim=0)
+
     # Check if clothing-related labels win
-    clothing_prob = probs[0].item() + probs[1].item()
-    best_idx = probs.argmax().item()
-    
-    is_cloth = best_idx in [0, 1] and clothing_prob > threshold
-    return is_cloth, clothing_prob, labels[best_idx]
+    clothing_prob = det_probs[0].item() + det_probs[1].item()
+    best_det = det_probs.argmax().item()
+    is_cloth = best_det in [0, 1] and clothing_prob > threshold
 
-def classify_clothing(model, processor, image):
-    """Full classification"""
-    types = ["t-shirt", "shirt", "jeans", "trousers", "shorts", "dress", 
-             "sneakers", "formal shoes", "jacket", "sweater", "hoodie", "skirt"]
-    
-    inputs = processor(text=[f"a photo of a {t}" for t in types], images=image, return_tensors="pt", padding=True)
-    with torch.no_grad():
-        probs = model(**inputs).logits_per_image.softmax(dim=1)[0]
-    best_idx = probs.argmax().item()
-    
-    return types[best_idx], probs[best_idx].item()
+    best_type = type_probs.argmax().item()
+
+    return {
+        'is_clothing': is_cloth,
+        'confidence': clothing_prob,
+        'detected': DETECTION_LABELS[best_det],
+        'type': CLOTHING_TYPES[best_type],
+        'type_confidence': type_probs[best_type].item()
+    }
 
 def extract_colors(image, n=2):
-    """Extract dominant colors"""
+    """Extract dominant colors via a 4-bit-per-channel histogram.
+
+    Packing each pixel into a 12-bit bin and taking the biggest bins
+    replaces k-means entirely - one bincount over the array instead of
+    ten Lloyd's runs.
+    """
     img = image.copy()
-    img.thumbnail((100, 100))
-    pixels = np.array(img).reshape(-1, 3)
-    kmeans = KMeans(n_clusters=n, random_state=42, n_init=10).fit(pixels)
-    colors = ['#{:02x}{:02x}{:02x}'.format(*c.astype(int)) for c in kmeans.cluster_centers_]
+    # Bilinear is plenty for a color histogram and much faster than bicubic
+    img.thumbnail((100, 100), Image.Resampling.BILINEAR)
+    pixels = np.asarray(img).reshape(-1, 3)
+    bins = ((pixels[:, 0] >> 4).astype(np.uint16) << 8) | \
+           ((pixels[:, 1] >> 4).astype(np.uint16) << 4) | \
+           (pixels[:, 2] >> 4)
+    counts = np.bincount(bins, minlength=4096)
+    top = np.argpartition(counts, -n)[-n:]
+    top = top[np.argsort(counts[top])[::-1]]
+    # Flat frames fill fewer than n bins - drop zero-count bins so we
+    # never report a phantom color no pixel has
+    top = top[counts[top] > 0]
+    # Expand bins to channel midpoints, pack to 24-bit, format once
+    r = ((top >> 8) << 4) | 0x8
+    g = ((top >> 4 & 0xF) << 4) | 0x8
+    b = ((top & 0xF) << 4) | 0x8
+    packed = (r.astype(np.uint32) << 16) | (g << 8) | b
+    colors = [f'#{v:06x}' for v in packed]
+    while len(colors) < n:
+        colors.append(colors[0])  # repeat dominant, like k-means did
     return colors
 
 # ===== UI =====
@@ -88,21 +158,43 @@ with col1:
     camera_image = st.camera_input("Take photo when ready", key="camera")
     
     if camera_image:
+        # Full-res decode for the photo we keep; CLIP resizes to 224px
+        # anyway, so hand it a draft-decoded copy instead of degrading
+        # the saved wardrobe image
         image = Image.open(camera_image).convert('RGB')
+        camera_image.seek(0)
+        small = Image.open(camera_image)
+        small.draft('RGB', (256, 256))
+        small = small.convert('RGB')
         
         # Load model and check
-        model, processor = load_model()
-        
-        with st.spinner("🔍 Checking for clothing..."):
-            is_cloth, confidence, detected = is_clothing(model, processor, image, confidence_threshold)
-        
-        if is_cloth:
+        model, processor, text_features = load_model()
+
+        # Streamlit reruns the whole script on any widget change (e.g. the
+        # threshold slider), re-classifying the same photo. Memoize by
+        # perceptual hash so only genuinely new frames hit CLIP.
+        frame_hash = dhash(small)
+        clip_cache = st.session_state.setdefault('clip_cache', {})
+        if frame_hash in clip_cache:
+            result = dict(clip_cache[frame_hash])
+        else:
+            with st.spinner("🔍 Checking for clothing..."):
+                result = classify_frame(model, processor, text_features, small, confidence_threshold)
+            clip_cache[frame_hash] = result
+        # The threshold only gates the final decision - reapply it to the
+        # cached probabilities so slider tweaks don't invalidate the cache
+        result['is_clothing'] = (result['detected'] in DETECTION_LABELS[:2]
+                                 and result['confidence'] > confidence_threshold)
+
+        if result['is_clothing']:
+            confidence = result['confidence']
             st.success(f"✅ Clothing Detected! ({confidence*100:.0f}% confidence)")
             
-            # Classify
-            with st.spinner("🤖 Classifying..."):
-                clothing_type, type_conf = classify_clothing(model, processor, image)
-                colors = extract_colors(image)
+            # Type already classified in the same forward pass
+            clothing_type = result['type']
+            type_conf = result['type_confidence']
+            with st.spinner("🎨 Extracting colors..."):
+                colors = extract_colors(small)
             
             # Display results
             st.metric("Type", clothing_type.title(), f"{type_conf*100:.0f}%")
@@ -120,20 +212,27 @@ with col1:
                 os.makedirs('wardrobe_images', exist_ok=True)
                 save_path = f"wardrobe_images/auto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
                 image.save(save_path)
+                # Small WebP thumb for the gallery column - the full-res
+                # JPEG never needs to be decoded again just to show at 100px
+                thumb_path = save_path.replace('.jpg', '_thumb.webp')
+                thumb = image.copy()
+                thumb.thumbnail((256, 256), Image.Resampling.BILINEAR)
+                thumb.save(thumb_path, 'WEBP', quality=80)
                 st.success(f"💾 Saved to: `{save_path}`")
-                
+
                 # Store in session for later
                 if 'captured_items' not in st.session_state:
                     st.session_state.captured_items = []
                 st.session_state.captured_items.append({
                     'path': save_path,
+                    'thumb': thumb_path,
                     'type': clothing_type,
                     'colors': colors,
                     'confidence': type_conf
                 })
         else:
-            st.warning(f"❌ No clothing detected ({detected})")
-            st.caption(f"Confidence: {confidence*100:.0f}% (need >{confidence_threshold*100:.0f}%)")
+            st.warning(f"❌ No clothing detected ({result['detected']})")
+            st.caption(f"Confidence: {result['confidence']*100:.0f}% (need >{confidence_threshold*100:.0f}%)")
 
 with col2:
     st.subheader("Captured Items")
@@ -146,8 +245,11 @@ with col2:
             with st.container():
                 c1, c2 = st.columns([1, 2])
                 with c1:
-                    if os.path.exists(item['path']):
-                        st.image(item['path'], width=100)
+                    display_path = item.get('thumb', item['path'])
+                    if not os.path.exists(display_path):
+                        display_path = item['path']
+                    if os.path.exists(display_path):
+                        st.image(display_path, width=100)
                 with c2:
                     st.write(f"**{item['type'].title()}**")
                     st.caption(f"Confidence: {item['confidence']*100:.0f}%")
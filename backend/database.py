@@ -1,24 +1,46 @@
 # database.py - Database setup for FastAPI
 import sqlite3
+import threading
 from contextlib import contextmanager
 import os
 
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'wardrobe.db')
 
+# One long-lived connection per worker thread: FastAPI runs sync
+# endpoints on a bounded threadpool, so this gives a small persistent
+# pool without locking, and each request skips the open/close plus
+# pragma setup and keeps its page cache warm.
+_local = threading.local()
+
 def get_db_connection():
-    """Get database connection with row factory"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """Get the calling thread's persistent connection"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run during writes; NORMAL sync + memory temp store
+        # and mmap'd pages cut per-request fsync and read latency
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-65536')
+        # Writers wait for the WAL lock instead of failing immediately
+        conn.execute('PRAGMA busy_timeout=5000')
+        _local.conn = conn
     return conn
 
 @contextmanager
 def get_db():
-    """Context manager for database connection"""
+    """Context manager yielding the thread's long-lived connection"""
     conn = get_db_connection()
     try:
         yield conn
-    finally:
-        conn.close()
+    except Exception:
+        # The connection outlives the request - never leave a failed
+        # transaction open on it
+        conn.rollback()
+        raise
 
 def init_db():
     """Initialize database tables"""
@@ -69,7 +91,47 @@ def init_db():
             c.execute('ALTER TABLE clothes ADD COLUMN image_hash TEXT')
         except sqlite3.OperationalError:
             pass
-            
+
+        try:
+            c.execute('ALTER TABLE clothes ADD COLUMN thumb_path TEXT')
+        except sqlite3.OperationalError:
+            pass
+
+        # Integer epoch columns the Streamlit app filters and sorts on
+        # (same migration app.py runs - either side may touch the db first)
+        for col in ('last_worn_ts', 'created_ts'):
+            try:
+                c.execute(f'ALTER TABLE clothes ADD COLUMN {col} INTEGER')
+            except sqlite3.OperationalError:
+                pass
+        c.execute('''UPDATE clothes SET last_worn_ts = CAST(strftime('%s', last_worn) AS INTEGER)
+                     WHERE last_worn IS NOT NULL AND last_worn_ts IS NULL''')
+        c.execute('''UPDATE clothes SET created_ts = CAST(strftime('%s', created_at) AS INTEGER)
+                     WHERE created_at IS NOT NULL AND created_ts IS NULL''')
+
+        # Indexes for the hot lookups: dedupe by hash, list filters, and
+        # the created_at sort in get_all_clothes
+        c.execute('CREATE INDEX IF NOT EXISTS idx_clothes_hash ON clothes(image_hash)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_clothes_type ON clothes(clothing_type)')
+        # (named distinctly from the Streamlit app's partial idx_clothes_laundry
+        # since both sides migrate the same wardrobe.db)
+        c.execute('CREATE INDEX IF NOT EXISTS idx_clothes_in_laundry ON clothes(in_laundry)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_clothes_created ON clothes(created_at DESC)')
+        # Covering index so the stats aggregates are index-only scans
+        c.execute('CREATE INDEX IF NOT EXISTS idx_clothes_flags ON clothes(clothing_type, in_laundry, favorite, times_worn)')
+
+        # History ORDER BY worn_at DESC LIMIT becomes an index scan with
+        # early termination instead of sorting the whole table (same name
+        # and definition as the Streamlit app's index on the shared db)
+        c.execute('CREATE INDEX IF NOT EXISTS idx_outfits_worn_at ON outfits(worn_at DESC)')
+        # Item-id columns, so joins from clothes back into outfits can
+        # seek if the planner ever flips the join order
+        for col in ('top_id', 'bottom_id', 'shoes_id', 'dress_id', 'outerwear_id'):
+            c.execute(f'CREATE INDEX IF NOT EXISTS idx_outfits_{col} ON outfits({col})')
+
+        # Refresh planner statistics so the new indexes get picked
+        c.execute('ANALYZE')
+
         conn.commit()
 
 # Initialize on import
@@ -1,17 +1,42 @@
 # main.py - FastAPI Application Entry Point
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
+# orjson serializes list-of-model payloads several times faster than the
+# stdlib encoder; fall back cleanly if it isn't installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+
 # Import routers
 from routers import clothes, classify, outfits, weather, stats
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the CLIP classifier at startup so the first /api/classify
+    # request doesn't pay the ~2 s model load. The dummy inference also
+    # triggers torch's lazy kernel init.
+    try:
+        from PIL import Image
+        classify.get_classifier()._classify_all(Image.new('RGB', (224, 224)))
+    except Exception as e:
+        print(f"Classifier preload failed (will retry on first request): {e}")
+    yield
+
 # Create FastAPI app
 app = FastAPI(
     title="AI Outfit API",
     description="Backend API for AI Outfit - Intelligent Wardrobe Management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 # CORS configuration for frontend
@@ -23,10 +48,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (images are already compressed, but they go
+# through the static mount below which sets its own headers)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with long-lived caching for the image gallery.
+
+    Wardrobe image filenames embed a content hash, so a given URL never
+    changes content - browsers can cache them forever instead of
+    re-downloading every image on each gallery reload.
+    """
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 # Serve wardrobe images statically
 IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "wardrobe_images")
 os.makedirs(IMAGES_DIR, exist_ok=True)
-app.mount("/images", StaticFiles(directory=IMAGES_DIR), name="images")
+app.mount("/images", CachedStaticFiles(directory=IMAGES_DIR), name="images")
 
 # Register routers
 app.include_router(clothes.router)
@@ -29,6 +29,7 @@ class ClothingUpdate(BaseModel):
 class ClothingResponse(ClothingBase):
     id: int
     image_path: str
+    thumb_path: Optional[str] = None
     times_worn: int = 0
     last_worn: Optional[str] = None
     in_laundry: bool = False
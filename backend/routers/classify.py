@@ -3,12 +3,13 @@ from fastapi import APIRouter, UploadFile, File, HTTPException
 import os
 import shutil
 from datetime import datetime
+from pathlib import Path
 from PIL import Image
 
 router = APIRouter(prefix="/api", tags=["classification"])
 
-# Get paths relative to project root
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Get paths relative to project root - resolved once at import
+PROJECT_ROOT = str(Path(__file__).resolve().parents[2])
 UPLOAD_DIR = os.path.join(PROJECT_ROOT, "wardrobe_images")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -30,21 +31,15 @@ TYPE_MAP = {
     'cardigan': 'outerwear'
 }
 
-# Lazy load classifier to avoid slow startup
-_classifier = None
-
+# The classifier singleton lives in classifier.py so the Streamlit app
+# and the API share one loaded model per process
 def get_classifier():
-    global _classifier
-    if _classifier is None:
-        try:
-            from classifier import ClothingClassifier
-            print("Loading CLIP classifier...")
-            _classifier = ClothingClassifier()
-            print("CLIP classifier loaded successfully!")
-        except Exception as e:
-            print(f"Failed to load classifier: {e}")
-            raise
-    return _classifier
+    try:
+        from classifier import get_classifier as _get
+        return _get()
+    except Exception as e:
+        print(f"Failed to load classifier: {e}")
+        raise
 
 @router.post("/classify")
 async def classify_image(file: UploadFile = File(...)):
@@ -56,19 +51,20 @@ async def classify_image(file: UploadFile = File(...)):
         filename = f"classify_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
         temp_path = os.path.join(UPLOAD_DIR, filename)
         
-        # Save uploaded file properly
-        contents = await file.read()
+        # Stream the upload straight to disk - no full in-memory bytes copy
         with open(temp_path, "wb") as f:
-            f.write(contents)
+            shutil.copyfileobj(file.file, f, length=1024 * 1024)
         
         print(f"Saved image to: {temp_path}")
         print(f"File exists: {os.path.exists(temp_path)}")
         print(f"File size: {os.path.getsize(temp_path)} bytes")
         
-        # Verify it's a valid image
+        # Verify it's a valid image. load() fully decodes (raising on
+        # corrupt data), so the same object can go straight to the
+        # classifier without a second decode.
         try:
             img = Image.open(temp_path)
-            img.verify()
+            img.load()
             print(f"Image valid: {img.format} {img.size}")
         except Exception as img_err:
             print(f"Image validation failed: {img_err}")
@@ -90,7 +86,7 @@ async def classify_image(file: UploadFile = File(...)):
             }
         
         print("Running classification...")
-        result = classifier.classify_full(temp_path)
+        result = classifier.classify_full(img)
         print(f"Classification result: {result}")
         
         if result.get('success'):
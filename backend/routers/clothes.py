@@ -4,20 +4,61 @@ from typing import List, Optional
 import os
 import shutil
 from datetime import datetime
+from pathlib import Path
 
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_BACKEND_DIR = str(Path(__file__).resolve().parents[1])
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
 
 from database import get_db
 from models.schemas import ClothingResponse, ClothingCreate, ClothingUpdate
+from routers.stats import invalidate_stats
 
 router = APIRouter(prefix="/api/clothes", tags=["clothes"])
 
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "wardrobe_images")
+def _row_to_clothing(row):
+    """Build a ClothingResponse dict from a clothes row (shared by all reads)"""
+    return {
+        "id": row["id"],
+        "image_path": row["image_path"],
+        "thumb_path": row["thumb_path"],
+        "clothing_type": row["clothing_type"],
+        "color_primary": row["color_primary"],
+        "color_secondary": row["color_secondary"],
+        "pattern": row["pattern"] or "solid",
+        "formality": row["formality"] or "casual",
+        "season_weight": row["season_weight"] or "medium",
+        "times_worn": row["times_worn"] or 0,
+        "last_worn": row["last_worn"],
+        "in_laundry": bool(row["in_laundry"]),
+        "favorite": bool(row["favorite"]),
+        "created_at": row["created_at"]
+    }
+
+UPLOAD_DIR = str(Path(__file__).resolve().parents[2] / "wardrobe_images")
 
 # Ensure upload directory exists
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+def _make_thumbnail(filepath):
+    """Write a 256px WebP thumbnail next to the original, for gallery views.
+
+    Galleries display at ~100-250px, so serving the 3-5 MB phone photo is
+    wasted bytes and decode time; the WebP thumb is ~30x smaller.
+    """
+    from PIL import Image
+    thumb_path = os.path.splitext(filepath)[0] + "_thumb.webp"
+    try:
+        img = Image.open(filepath)
+        img.draft('RGB', (256, 256))
+        img = img.convert('RGB')
+        img.thumbnail((256, 256), Image.Resampling.BILINEAR)
+        img.save(thumb_path, 'WEBP', quality=80)
+        return thumb_path
+    except OSError:
+        return None
+
 @router.get("", response_model=List[ClothingResponse])
 def get_all_clothes(
     clothing_type: Optional[str] = None,
@@ -40,25 +81,7 @@ def get_all_clothes(
         query += " ORDER BY created_at DESC"
         c.execute(query, params)
         
-        clothes = []
-        for row in c.fetchall():
-            clothes.append({
-                "id": row["id"],
-                "image_path": row["image_path"],
-                "clothing_type": row["clothing_type"],
-                "color_primary": row["color_primary"],
-                "color_secondary": row["color_secondary"],
-                "pattern": row["pattern"] or "solid",
-                "formality": row["formality"] or "casual",
-                "season_weight": row["season_weight"] or "medium",
-                "times_worn": row["times_worn"] or 0,
-                "last_worn": row["last_worn"],
-                "in_laundry": bool(row["in_laundry"]),
-                "favorite": bool(row["favorite"]),
-                "created_at": row["created_at"]
-            })
-        
-        return clothes
+        return [_row_to_clothing(row) for row in c.fetchall()]
 
 @router.get("/{item_id}", response_model=ClothingResponse)
 def get_clothing(item_id: int):
@@ -71,21 +94,7 @@ def get_clothing(item_id: int):
         if not row:
             raise HTTPException(status_code=404, detail="Item not found")
         
-        return {
-            "id": row["id"],
-            "image_path": row["image_path"],
-            "clothing_type": row["clothing_type"],
-            "color_primary": row["color_primary"],
-            "color_secondary": row["color_secondary"],
-            "pattern": row["pattern"] or "solid",
-            "formality": row["formality"] or "casual",
-            "season_weight": row["season_weight"] or "medium",
-            "times_worn": row["times_worn"] or 0,
-            "last_worn": row["last_worn"],
-            "in_laundry": bool(row["in_laundry"]),
-            "favorite": bool(row["favorite"]),
-            "created_at": row["created_at"]
-        }
+        return _row_to_clothing(row)
 
 @router.post("", response_model=ClothingResponse)
 async def create_clothing(
@@ -98,53 +107,57 @@ async def create_clothing(
     season_weight: str = Form("medium")
 ):
     """Upload and create new clothing item"""
-    # Read file content for hashing
-    contents = await file.read()
-    
-    # Calculate hash to prevent duplicates
+    # Hash while streaming to a temp file - one pass over the upload,
+    # no full in-memory copy
     import hashlib
-    file_hash = hashlib.md5(contents).hexdigest()
-    
+    import tempfile
+
+    # SHA-256 dispatches to SHA-NI on current x86; truncate to keep the
+    # stored 32-char format compatible with existing md5 hashes
+    h = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmpf:
+            while chunk := await file.read(65536):
+                h.update(chunk)
+                tmpf.write(chunk)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    file_hash = h.hexdigest()[:32]
+
     with get_db() as conn:
         c = conn.cursor()
-        
+
         # Check if hash exists
         c.execute("SELECT * FROM clothes WHERE image_hash = ?", (file_hash,))
         existing = c.fetchone()
-        
+
         if existing:
+            os.unlink(tmp_path)
             # Return existing item instead of creating duplicate
-            return {
-                "id": existing["id"],
-                "image_path": existing["image_path"],
-                "clothing_type": existing["clothing_type"],
-                "color_primary": existing["color_primary"],
-                "color_secondary": existing["color_secondary"],
-                "pattern": existing["pattern"] or "solid",
-                "formality": existing["formality"] or "casual",
-                "season_weight": existing["season_weight"] or "medium",
-                "times_worn": existing["times_worn"] or 0,
-                "last_worn": existing["last_worn"],
-                "in_laundry": bool(existing["in_laundry"]),
-                "favorite": bool(existing["favorite"]),
-                "created_at": existing["created_at"]
-            }
+            return _row_to_clothing(existing)
             
-        # Save image if new
+        # Move the already-written temp file into place
         filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file_hash[:8]}.jpg"
         filepath = os.path.join(UPLOAD_DIR, filename)
-        
-        with open(filepath, "wb") as f:
-            f.write(contents)
-        
+        os.replace(tmp_path, filepath)
+        thumb_path = _make_thumbnail(filepath)
+
+        # created_ts mirrors created_at - the Streamlit app sorts the
+        # gallery on the integer column
+        now = datetime.now()
         c.execute('''
-            INSERT INTO clothes (image_path, clothing_type, color_primary, color_secondary,
-                               pattern, formality, season_weight, times_worn, in_laundry, favorite, image_hash, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?)
-        ''', (filepath, clothing_type, color_primary, color_secondary, pattern, formality, season_weight, file_hash, datetime.now().isoformat()))
+            INSERT INTO clothes (image_path, thumb_path, clothing_type, color_primary, color_secondary,
+                               pattern, formality, season_weight, times_worn, in_laundry, favorite, image_hash,
+                               created_at, created_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?, ?)
+        ''', (filepath, thumb_path, clothing_type, color_primary, color_secondary, pattern, formality, season_weight,
+              file_hash, now.isoformat(), int(now.timestamp())))
         conn.commit()
         item_id = c.lastrowid
-    
+
+    invalidate_stats()
     return get_clothing(item_id)
 
 @router.put("/{item_id}", response_model=ClothingResponse)
@@ -168,13 +181,15 @@ def update_clothing(item_id: int, update: ClothingUpdate):
             raise HTTPException(status_code=400, detail="No fields to update")
         
         params.append(item_id)
-        c.execute(f"UPDATE clothes SET {', '.join(updates)} WHERE id = ?", params)
+        c.execute(f"UPDATE clothes SET {', '.join(updates)} WHERE id = ? RETURNING *", params)
+        row = c.fetchone()
         conn.commit()
-        
-        if c.rowcount == 0:
+
+        if row is None:
             raise HTTPException(status_code=404, detail="Item not found")
-    
-    return get_clothing(item_id)
+
+    invalidate_stats()
+    return _row_to_clothing(row)
 
 @router.delete("/{item_id}")
 def delete_clothing(item_id: int):
@@ -183,23 +198,25 @@ def delete_clothing(item_id: int):
         c = conn.cursor()
         
         # Get image path first
-        c.execute("SELECT image_path FROM clothes WHERE id = ?", (item_id,))
+        c.execute("SELECT image_path, thumb_path FROM clothes WHERE id = ?", (item_id,))
         row = c.fetchone()
-        
+
         if not row:
             raise HTTPException(status_code=404, detail="Item not found")
-        
-        # Delete image file
-        if row["image_path"] and os.path.exists(row["image_path"]):
-            try:
-                os.remove(row["image_path"])
-            except:
-                pass
+
+        # Delete image file and its thumbnail
+        for path in (row["image_path"], row["thumb_path"]):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except:
+                    pass
         
         # Delete from database
         c.execute("DELETE FROM clothes WHERE id = ?", (item_id,))
         conn.commit()
-    
+
+    invalidate_stats()
     return {"message": "Item deleted"}
 
 @router.post("/{item_id}/laundry")
@@ -207,15 +224,16 @@ def toggle_laundry(item_id: int):
     """Toggle laundry status"""
     with get_db() as conn:
         c = conn.cursor()
-        c.execute("UPDATE clothes SET in_laundry = NOT in_laundry WHERE id = ?", (item_id,))
+        # RETURNING (SQLite >= 3.35) gives back the flipped value in the
+        # same statement - no follow-up SELECT
+        c.execute("UPDATE clothes SET in_laundry = NOT in_laundry WHERE id = ? RETURNING in_laundry", (item_id,))
+        row = c.fetchone()
         conn.commit()
-        
-        if c.rowcount == 0:
+
+        if row is None:
             raise HTTPException(status_code=404, detail="Item not found")
-        
-        c.execute("SELECT in_laundry FROM clothes WHERE id = ?", (item_id,))
-        row = c.fetchone()
-    
+
+    invalidate_stats()
     return {"in_laundry": bool(row["in_laundry"])}
 
 @router.post("/{item_id}/favorite")
@@ -223,15 +241,14 @@ def toggle_favorite(item_id: int):
     """Toggle favorite status"""
     with get_db() as conn:
         c = conn.cursor()
-        c.execute("UPDATE clothes SET favorite = NOT favorite WHERE id = ?", (item_id,))
+        c.execute("UPDATE clothes SET favorite = NOT favorite WHERE id = ? RETURNING favorite", (item_id,))
+        row = c.fetchone()
         conn.commit()
-        
-        if c.rowcount == 0:
+
+        if row is None:
             raise HTTPException(status_code=404, detail="Item not found")
-        
-        c.execute("SELECT favorite FROM clothes WHERE id = ?", (item_id,))
-        row = c.fetchone()
-    
+
+    invalidate_stats()
     return {"favorite": bool(row["favorite"])}
 
 @router.delete("/clear-all")
@@ -240,43 +257,53 @@ def clear_all():
     with get_db() as conn:
         c = conn.cursor()
         
-        # Get all image paths
-        c.execute("SELECT image_path FROM clothes")
+        # Get all image and thumbnail paths
+        c.execute("SELECT image_path, thumb_path FROM clothes")
         rows = c.fetchall()
-        
-        # Delete files
+
+        # Delete files (originals and their thumbnails)
         for row in rows:
-            if row["image_path"] and os.path.exists(row["image_path"]):
-                try:
-                    os.remove(row["image_path"])
-                except:
-                    pass
+            for path in (row["image_path"], row["thumb_path"]):
+                if path and os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except:
+                        pass
         
         # Delete from DB
         c.execute("DELETE FROM clothes")
         c.execute("DELETE FROM outfits") # Clear history too
         conn.commit()
-    
+
+    invalidate_stats()
     return {"message": "All items cleared"}
 
 @router.post("/deduplicate")
 def remove_duplicates():
     """Remove duplicate items based on image content hash"""
     import hashlib
-    
+    from concurrent.futures import ThreadPoolExecutor
+
+    def hash_one(row):
+        try:
+            with open(row['image_path'], 'rb') as f:
+                return (hashlib.sha256(f.read()).hexdigest()[:32], row['id'])
+        except OSError:
+            return None
+
     removed_count = 0
     with get_db() as conn:
         c = conn.cursor()
         
-        # 1. Update hashes for items that don't have them
+        # 1. Update hashes for items that don't have them: file reads run
+        # in parallel (disk I/O releases the GIL), then one executemany
         c.execute("SELECT id, image_path FROM clothes WHERE image_hash IS NULL")
         rows = c.fetchall()
         
-        for row in rows:
-            if os.path.exists(row['image_path']):
-                with open(row['image_path'], 'rb') as f:
-                    file_hash = hashlib.md5(f.read()).hexdigest()
-                    c.execute("UPDATE clothes SET image_hash = ? WHERE id = ?", (file_hash, row['id']))
+        if rows:
+            with ThreadPoolExecutor(max_workers=8) as ex:
+                pairs = [p for p in ex.map(hash_one, rows) if p]
+            c.executemany("UPDATE clothes SET image_hash = ? WHERE id = ?", pairs)
         
         conn.commit()
         
@@ -313,5 +340,6 @@ def remove_duplicates():
                 removed_count += 1
         
         conn.commit()
-        
+
+    invalidate_stats()
     return {"message": f"Removed {removed_count} duplicate items"}
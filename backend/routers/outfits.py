@@ -2,27 +2,57 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from datetime import datetime
+from pathlib import Path
 import os
 import sys
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# Resolved once at import: backend dir for database/models, project root
+# for the recommender
+_BACKEND_DIR = str(Path(__file__).resolve().parents[1])
+_PROJECT_ROOT = str(Path(__file__).resolve().parents[2])
+for _p in (_BACKEND_DIR, _PROJECT_ROOT):
+    if _p not in sys.path:
+        sys.path.append(_p)
 
 from database import get_db
 from models.schemas import OutfitSuggestion, OutfitLogRequest, OutfitHistoryItem
+from routers.stats import invalidate_stats
 
 router = APIRouter(prefix="/api/outfits", tags=["outfits"])
 
+_SLOT_KEYS = ('top', 'bottom', 'shoes', 'dress', 'outerwear')
+
+# Built once at import - explicit column order so rows unpack positionally
+_HISTORY_SQL = '''
+    SELECT o.id, o.occasion, o.weather_temp, o.weather_condition, o.worn_at,
+           t.image_path, b.image_path, s.image_path, d.image_path, w.image_path
+    FROM outfits o
+    LEFT JOIN clothes t ON o.top_id = t.id
+    LEFT JOIN clothes b ON o.bottom_id = b.id
+    LEFT JOIN clothes s ON o.shoes_id = s.id
+    LEFT JOIN clothes d ON o.dress_id = d.id
+    LEFT JOIN clothes w ON o.outerwear_id = w.id
+    ORDER BY o.worn_at DESC
+    LIMIT ?
+'''
+
+def _slot(item):
+    """Build one OutfitItem dict from a recommender candidate"""
+    return {
+        "id": item['id'],
+        "image_path": item['image_path'],
+        "clothing_type": item['type'],
+        "color_primary": item.get('color_primary')
+    }
+
 # Lazy load recommender
 _recommender = None
 
 def get_recommender():
     global _recommender
     if _recommender is None:
-        parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        sys.path.insert(0, parent_dir)
         from recommender import OutfitRecommender
-        db_path = os.path.join(parent_dir, 'wardrobe.db')
+        db_path = os.path.join(_PROJECT_ROOT, 'wardrobe.db')
         _recommender = OutfitRecommender(db_path)
     return _recommender
 
@@ -39,86 +69,57 @@ def get_outfit_suggestions(
     recommender = get_recommender()
     suggestions = recommender.get_suggestions(occasion, weather, num)
     
-    results = []
-    for outfit, score in suggestions:
-        suggestion = OutfitSuggestion(
+    # One helper call per filled slot instead of five copy-pasted blocks.
+    # model_construct skips per-field validation - the recommender is our
+    # own trusted code, and unset slots must stay None for the schema.
+    return [
+        OutfitSuggestion.model_construct(
             type=outfit.get('type', 'regular'),
-            score=score
+            score=score,
+            **{slot: _slot(outfit[slot]) if outfit.get(slot) else None
+               for slot in _SLOT_KEYS}
         )
-        
-        if outfit.get('top'):
-            suggestion.top = {
-                "id": outfit['top']['id'],
-                "image_path": outfit['top']['image_path'],
-                "clothing_type": outfit['top']['type'],
-                "color_primary": outfit['top'].get('color_primary')
-            }
-        
-        if outfit.get('bottom'):
-            suggestion.bottom = {
-                "id": outfit['bottom']['id'],
-                "image_path": outfit['bottom']['image_path'],
-                "clothing_type": outfit['bottom']['type'],
-                "color_primary": outfit['bottom'].get('color_primary')
-            }
-        
-        if outfit.get('shoes'):
-            suggestion.shoes = {
-                "id": outfit['shoes']['id'],
-                "image_path": outfit['shoes']['image_path'],
-                "clothing_type": outfit['shoes']['type'],
-                "color_primary": outfit['shoes'].get('color_primary')
-            }
-        
-        if outfit.get('dress'):
-            suggestion.dress = {
-                "id": outfit['dress']['id'],
-                "image_path": outfit['dress']['image_path'],
-                "clothing_type": outfit['dress']['type'],
-                "color_primary": outfit['dress'].get('color_primary')
-            }
-            
-        # Add support for outerwear
-        if outfit.get('outerwear'):
-             suggestion.outerwear = {
-                "id": outfit['outerwear']['id'],
-                "image_path": outfit['outerwear']['image_path'],
-                "clothing_type": outfit['outerwear']['type'],
-                "color_primary": outfit['outerwear'].get('color_primary')
-            }
-        
-        results.append(suggestion)
-    
-    return results
+        for outfit, score in suggestions
+    ]
 
 @router.post("/log")
 def log_outfit(outfit: OutfitLogRequest):
     """Log a worn outfit"""
+    now = datetime.now()
     with get_db() as conn:
         c = conn.cursor()
-        
+
+        # Take the write lock upfront so the insert and the wear-count
+        # update commit as one unit with a single fsync
+        c.execute('BEGIN IMMEDIATE')
+
         c.execute('''
             INSERT INTO outfits (top_id, bottom_id, shoes_id, dress_id, outerwear_id, occasion, weather_temp, weather_condition, worn_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             outfit.top_id, outfit.bottom_id, outfit.shoes_id, outfit.dress_id, outfit.outerwear_id,
             outfit.occasion, outfit.weather_temp, outfit.weather_condition,
-            datetime.now().isoformat()
+            now.isoformat()
         ))
-        
+
         outfit_id = c.lastrowid
-        
-        # Update times_worn for each item
-        now = datetime.now().isoformat()
-        for item_id in [outfit.top_id, outfit.bottom_id, outfit.shoes_id, outfit.dress_id, outfit.outerwear_id]:
-            if item_id:
-                c.execute('''
-                    UPDATE clothes SET times_worn = COALESCE(times_worn, 0) + 1, last_worn = ?
-                    WHERE id = ?
-                ''', (now, item_id))
+
+        # Update times_worn for all worn items in one statement
+        item_ids = [i for i in (outfit.top_id, outfit.bottom_id, outfit.shoes_id,
+                                outfit.dress_id, outfit.outerwear_id) if i]
+        if item_ids:
+            placeholders = ','.join('?' * len(item_ids))
+            # Keep last_worn_ts in step with last_worn - the Streamlit
+            # app's "forgotten items" filter reads the integer column
+            c.execute(f'''
+                UPDATE clothes SET times_worn = COALESCE(times_worn, 0) + 1,
+                                   last_worn = ?, last_worn_ts = ?
+                WHERE id IN ({placeholders})
+            ''', (now.isoformat(), int(now.timestamp()), *item_ids))
         
         conn.commit()
-    
+
+    invalidate_stats()
     return {"id": outfit_id, "message": "Outfit logged successfully"}
 
 @router.get("/history", response_model=List[OutfitHistoryItem])
@@ -126,36 +127,22 @@ def get_outfit_history(limit: int = Query(10, ge=1, le=50)):
     """Get outfit history"""
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''
-            SELECT o.*, 
-                   t.image_path as top_img, 
-                   b.image_path as bottom_img,
-                   s.image_path as shoes_img, 
-                   d.image_path as dress_img,
-                   w.image_path as outerwear_img
-            FROM outfits o
-            LEFT JOIN clothes t ON o.top_id = t.id
-            LEFT JOIN clothes b ON o.bottom_id = b.id
-            LEFT JOIN clothes s ON o.shoes_id = s.id
-            LEFT JOIN clothes d ON o.dress_id = d.id
-            LEFT JOIN clothes w ON o.outerwear_id = w.id
-            ORDER BY o.worn_at DESC 
-            LIMIT ?
-        ''', (limit,))
-        
-        history = []
-        for row in c.fetchall():
-            history.append(OutfitHistoryItem(
-                id=row['id'],
-                occasion=row['occasion'] or 'casual',
-                weather_temp=row['weather_temp'],
-                weather_condition=row['weather_condition'],
-                worn_at=row['worn_at'] or '',
-                top_img=row['top_img'],
-                bottom_img=row['bottom_img'],
-                shoes_img=row['shoes_img'],
-                dress_img=row['dress_img'],
-                outerwear_img=row['outerwear_img']
-            ))
-        
-        return history
+        c.execute(_HISTORY_SQL, (limit,))
+
+        # Positional unpacking + model_construct: rows come from our own
+        # query, so skip both the name lookups and Pydantic validation
+        return [
+            OutfitHistoryItem.model_construct(
+                id=r[0],
+                occasion=r[1] or 'casual',
+                weather_temp=r[2],
+                weather_condition=r[3],
+                worn_at=r[4] or '',
+                top_img=r[5],
+                bottom_img=r[6],
+                shoes_img=r[7],
+                dress_img=r[8],
+                outerwear_img=r[9]
+            )
+            for r in c.fetchall()
+        ]
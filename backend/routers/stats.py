@@ -1,40 +1,62 @@
 # routers/stats.py - Statistics API
 from fastapi import APIRouter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import contextlib
 import os
 import sys
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_BACKEND_DIR = str(Path(__file__).resolve().parents[1])
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
 
 from database import get_db
 from models.schemas import WardrobeStats
 
 router = APIRouter(prefix="/api", tags=["stats"])
 
+# Stats only change when something writes clothes or outfits, so cache
+# the computed response until a write bumps the version. Per-process
+# state - correct for the single-worker uvicorn setup this backend uses.
+_stats_version = 0
+_stats_cache = {"version": -1, "data": None}
+
+def invalidate_stats():
+    """Called by every endpoint that writes clothes or outfits"""
+    global _stats_version
+    _stats_version += 1
+
 @router.get("/stats", response_model=WardrobeStats)
 def get_wardrobe_stats():
     """Get wardrobe statistics"""
+    # Snapshot the version before the reads: if a write invalidates while
+    # we're querying, storing this older version below forces a recompute
+    # on the next request instead of caching pre-write data as current
+    v = _stats_version
+    if _stats_cache["version"] == v:
+        return _stats_cache["data"]
+
     with get_db() as conn:
         c = conn.cursor()
         
-        c.execute('SELECT COUNT(*) FROM clothes')
-        total = c.fetchone()[0]
-        
+        # One scan with conditional aggregation instead of four separate
+        # COUNT(*) passes over clothes
+        c.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(in_laundry = 1), 0),
+                   COALESCE(SUM(favorite = 1), 0),
+                   COALESCE(SUM(times_worn = 0 OR times_worn IS NULL), 0)
+            FROM clothes
+        ''')
+        total, in_laundry, favorites, never_worn = c.fetchone()
+
         c.execute('SELECT clothing_type, COUNT(*) FROM clothes GROUP BY clothing_type')
         by_type = dict(c.fetchall())
-        
-        c.execute('SELECT COUNT(*) FROM clothes WHERE in_laundry = 1')
-        in_laundry = c.fetchone()[0]
-        
-        c.execute('SELECT COUNT(*) FROM clothes WHERE favorite = 1')
-        favorites = c.fetchone()[0]
-        
-        c.execute('SELECT COUNT(*) FROM clothes WHERE times_worn = 0 OR times_worn IS NULL')
-        never_worn = c.fetchone()[0]
-        
+
         c.execute('SELECT COUNT(*) FROM outfits')
         total_outfits = c.fetchone()[0]
     
-    return WardrobeStats(
+    stats = WardrobeStats(
         total=total,
         by_type=by_type,
         in_laundry=in_laundry,
@@ -42,24 +64,33 @@ def get_wardrobe_stats():
         never_worn=never_worn,
         total_outfits=total_outfits
     )
+    _stats_cache["version"] = v
+    _stats_cache["data"] = stats
+    return stats
 
 @router.delete("/clear-all")
 def clear_all_data():
     """Clear all data (for testing)"""
+    def _safe_unlink(path):
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
     with get_db() as conn:
         c = conn.cursor()
-        
-        # Get image paths
-        c.execute('SELECT image_path FROM clothes')
-        for row in c.fetchall():
-            if row['image_path'] and os.path.exists(row['image_path']):
-                try:
-                    os.remove(row['image_path'])
-                except:
-                    pass
-        
+
+        # Collect every referenced file, then unlink in parallel - one
+        # syscall per file instead of a stat+remove pair, and the IO-bound
+        # unlinks overlap instead of running serially
+        c.execute('SELECT image_path, thumb_path FROM clothes')
+        paths = [p for row in c.fetchall()
+                 for p in (row['image_path'], row['thumb_path']) if p]
+        if paths:
+            with ThreadPoolExecutor(max_workers=32) as ex:
+                list(ex.map(_safe_unlink, paths))
+
         c.execute('DELETE FROM clothes')
         c.execute('DELETE FROM outfits')
         conn.commit()
-    
+
+    invalidate_stats()
     return {"message": "All data cleared"}
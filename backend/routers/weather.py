@@ -1,9 +1,12 @@
 # routers/weather.py - Weather API
-from fastapi import APIRouter
-import os
+from fastapi import APIRouter, Response
+from pathlib import Path
 import sys
+import time
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_PROJECT_ROOT = str(Path(__file__).resolve().parents[2])
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from models.schemas import WeatherResponse
 
@@ -15,16 +18,30 @@ _weather_service = None
 def get_weather_service():
     global _weather_service
     if _weather_service is None:
-        parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        sys.path.insert(0, parent_dir)
         from weather import WeatherService
         _weather_service = WeatherService()
     return _weather_service
 
+# Weather barely changes minute to minute - cache per city so polling
+# clients don't turn into one upstream HTTP call each
+_WEATHER_TTL = 300  # seconds
+_weather_cache = {}  # city -> (expires_at, response)
+
 @router.get("/weather", response_model=WeatherResponse)
-def get_weather(city: str = None):
-    """Get current weather"""
+def get_weather(response: Response, city: str = None):
+    """Get current weather (cached per city for 5 minutes)"""
+    # Let browsers cache too, matching the server-side TTL
+    response.headers["Cache-Control"] = f"public, max-age={_WEATHER_TTL}"
+
+    key = city or 'default'
+    now = time.monotonic()
+    cached = _weather_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
     ws = get_weather_service()
     weather = ws.get_weather(city)
     weather['emoji'] = ws.get_weather_icon_emoji(weather.get('condition', 'Clear'))
-    return WeatherResponse(**weather)
+    result = WeatherResponse(**weather)
+    _weather_cache[key] = (now + _WEATHER_TTL, result)
+    return result
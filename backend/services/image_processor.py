@@ -1,8 +1,39 @@
 # services/image_processor.py - Image processing utilities
 from PIL import Image
+import concurrent.futures
 import os
 from io import BytesIO
 
+# rembg's ONNX session takes seconds to build - create it once per
+# process instead of on every call
+_session = None
+
+def _get_session():
+    global _session
+    if _session is None:
+        from rembg import new_session
+        # u2netp: ~4x smaller than the default u2net, near-identical masks
+        # for single-garment photos
+        _session = new_session("u2netp")
+    return _session
+
+# Background removal is CPU-bound for hundreds of ms; a process pool
+# keeps it off FastAPI's event loop and worker threads
+_POOL = None
+
+def _get_pool():
+    global _POOL
+    if _POOL is None:
+        _POOL = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max(1, (os.cpu_count() or 2) // 2))
+    return _POOL
+
+async def remove_background_and_crop_async(image_path, output_path=None):
+    """Async wrapper: run background removal in the process pool."""
+    import asyncio
+    return await asyncio.get_event_loop().run_in_executor(
+        _get_pool(), remove_background_and_crop, image_path, output_path)
+
 def remove_background_and_crop(image_path, output_path=None):
     """
     Remove background from clothing image and auto-crop to content.
@@ -23,8 +54,9 @@ def remove_background_and_crop(image_path, output_path=None):
         
         print(f"Processing image: {image_path}")
         
-        # Remove background
-        output_data = remove(input_data)
+        # Remove background (shared session avoids reloading the model)
+        output_data = remove(input_data, session=_get_session(),
+                             post_process_mask=False)
         
         # Open as PIL Image
         img = Image.open(BytesIO(output_data)).convert('RGBA')
@@ -67,6 +99,58 @@ def remove_background_and_crop(image_path, output_path=None):
         return image_path
 
 
+def process_upload(image_path, output_path=None, max_size=512):
+    """Downscale then remove background and crop, all in memory.
+
+    rembg's runtime scales with pixel count, so resizing first cuts its
+    inference cost several-fold versus removing the background at full
+    resolution and resizing after. Only the final composite touches disk.
+    """
+    try:
+        from rembg import remove
+
+        img = Image.open(image_path)
+        img.draft('RGB', (max_size, max_size))
+        img = img.convert('RGB')
+        if max(img.size) > max_size:
+            img.thumbnail((max_size, max_size), Image.Resampling.BILINEAR)
+
+        buf = BytesIO()
+        img.save(buf, 'JPEG', quality=90)
+
+        print(f"Processing image: {image_path} at {img.size}")
+        output_data = remove(buf.getvalue(), session=_get_session(),
+                             post_process_mask=False)
+
+        img = Image.open(BytesIO(output_data)).convert('RGBA')
+
+        # Crop to content with some padding
+        bbox = img.getbbox()
+        if bbox:
+            padding = 10
+            left = max(0, bbox[0] - padding)
+            top = max(0, bbox[1] - padding)
+            right = min(img.width, bbox[2] + padding)
+            bottom = min(img.height, bbox[3] + padding)
+            img = img.crop((left, top, right, bottom))
+
+        # Composite onto white
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])
+
+        save_path = output_path or image_path
+        background.save(save_path, 'JPEG', quality=90, optimize=True)
+
+        print(f"Saved processed image: {save_path}")
+        return save_path
+
+    except Exception as e:
+        print(f"Image processing failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return image_path
+
+
 def resize_image(image_path, max_size=800):
     """Resize image if too large"""
     try:
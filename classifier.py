@@ -1,10 +1,18 @@
 # classifier.py - Fast CLIP-based Clothing Classifier
+import hashlib
+import os
+from collections import OrderedDict
+
 import torch
 from transformers import CLIPProcessor, CLIPModel
 from PIL import Image
-from sklearn.cluster import KMeans
 import numpy as np
 
+# Shared by classifier.py and auto_capture.py; override to trade accuracy
+# for speed, e.g. CLIP_MODEL_ID=wkcn/TinyCLIP-ViT-40M-32-Text-19M (~3-4x
+# fewer image-encoder FLOPs, same processor API)
+CLIP_MODEL_ID = os.getenv('CLIP_MODEL_ID', 'openai/clip-vit-base-patch32')
+
 class ClothingClassifier:
     def __init__(self, use_gpu=True):
         print("Loading CLIP model...")
@@ -13,12 +21,26 @@ class ClothingClassifier:
         self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
         print(f"Using device: {self.device}")
         
-        self.model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32").to(self.device)
-        self.processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-        
+        self.model = CLIPModel.from_pretrained(CLIP_MODEL_ID).to(self.device)
+        self.processor = CLIPProcessor.from_pretrained(CLIP_MODEL_ID)
+
         # Set to eval mode for faster inference
         self.model.eval()
-        
+
+        # Same speedups auto_capture uses: compiled kernels on GPU,
+        # int8-quantized linear layers on CPU (CLIP_QUANTIZE=0 opts out)
+        if self.device == "cuda":
+            # FP16 halves memory traffic and engages tensor cores - the
+            # safer precision drop for ViTs than int8
+            self.model = self.model.half()
+            try:
+                self.model = torch.compile(self.model, mode="reduce-overhead")
+            except Exception:
+                pass  # older torch or unsupported backend - run eager
+        elif os.getenv('CLIP_QUANTIZE', '1') != '0':
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
         print("CLIP model loaded!")
         
         self.clothing_types = [
@@ -49,45 +71,125 @@ class ClothingClassifier:
             "medium weight clothing": "medium",
             "heavy winter clothing": "heavy"
         }
-    
+
+        # The prompt groups never change, so encode all of them once here.
+        # Per image we then run only the image tower and slice one logits
+        # matrix per group instead of four full CLIP forwards.
+        self._groups = {
+            'type': self.clothing_types,
+            'formality': list(self.formality_levels.keys()),
+            'pattern': list(self.patterns.keys()),
+            'season': list(self.seasons.keys()),
+        }
+        self._offsets = {}
+        start = 0
+        for name, labels in self._groups.items():
+            self._offsets[name] = (start, start + len(labels))
+            start += len(labels)
+
+        prompts = [f"a photo of {label}"
+                   for labels in self._groups.values() for label in labels]
+
+        # Snapshot the embeddings to disk keyed by model id and a hash of
+        # the prompt strings: restarts skip the BPE tokenization and the
+        # text-tower forward, and any label edit gets a fresh file rather
+        # than silently reusing embeddings for the old labels
+        prompt_key = hashlib.blake2b(
+            '\n'.join(prompts).encode(), digest_size=8).hexdigest()
+        cache_file = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            '.text_features_' + CLIP_MODEL_ID.replace('/', '--')
+            + '-' + prompt_key + '.pt')
+        text_features = None
+        if os.path.exists(cache_file):
+            try:
+                cached = torch.load(cache_file, map_location=self.device)
+                if cached.shape[0] == len(prompts):
+                    text_features = cached
+            except Exception:
+                pass  # stale or corrupt snapshot - recompute below
+
+        if text_features is None:
+            text_inputs = self.processor(
+                text=prompts, return_tensors="pt",
+                padding='max_length', max_length=77, truncation=True)
+            text_inputs = {k: v.to(self.device) for k, v in text_inputs.items()}
+            with torch.inference_mode():
+                text_features = self.model.get_text_features(**text_inputs)
+            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+            try:
+                # Canonical fp32 on disk - a CUDA run (fp16 model) must
+                # not leave a snapshot a later CPU-only start would feed
+                # into fp32 matmuls
+                torch.save(text_features.float().cpu(), cache_file)
+            except OSError:
+                pass  # read-only deploy dir - just recompute next start
+
+        # Cast per device after either path: half on CUDA to match the
+        # fp16 model, fp32 everywhere else
+        if self.device == "cuda":
+            text_features = text_features.half()
+        else:
+            text_features = text_features.float()
+        self._text_features = text_features.to(self.device)
+
+        # Re-uploads of the same image (retries, threshold tweaks) skip
+        # the vision tower entirely via this embedding LRU
+        self._embed_cache = OrderedDict()
+        self._embed_cache_size = 256
+
+        if self.device == "cuda":
+            # Pay torch.compile's one-off compilation cost here instead of
+            # on the first user request
+            try:
+                self._classify_all(Image.new('RGB', (224, 224)))
+            except Exception:
+                pass
+
     def _resize_image(self, image, max_size=512):
-        """Resize image for faster processing"""
+        """Resize image for faster processing.
+
+        Bilinear is fine here: CLIP's processor resamples to 224px again
+        anyway, and the color histogram doesn't need Lanczos either.
+        """
         if max(image.size) > max_size:
             ratio = max_size / max(image.size)
             new_size = (int(image.size[0] * ratio), int(image.size[1] * ratio))
-            image = image.resize(new_size, Image.LANCZOS)
+            image = image.resize(new_size, Image.Resampling.BILINEAR)
         return image
     
-    def classify_full(self, image_path):
-        """Full classification with validation"""
+    def classify_full(self, image):
+        """Full classification with validation.
+
+        Accepts a path or an already-open PIL image, so callers that have
+        decoded the file (e.g. for validation) don't pay a second decode.
+        """
         try:
             # Load and resize image for speed
-            image = Image.open(image_path).convert('RGB')
+            if isinstance(image, (str, os.PathLike)):
+                image = Image.open(image)
+                # Let libjpeg decode at reduced scale - we downsize to
+                # 384px right after anyway
+                image.draft('RGB', (384, 384))
+            image = image.convert('RGB')
             image = self._resize_image(image, max_size=384)  # Smaller = faster
             
-            # Quick clothing detection + type classification in one pass
-            with torch.no_grad():
-                # Classify clothing type
-                clothing_type, type_conf = self._classify(image, self.clothing_types)
-                
-                # If very low confidence, might not be clothing
-                if type_conf < 0.15:
-                    return {
-                        'success': False,
-                        'error': 'not_clothing',
-                        'message': 'Could not detect clothing in image',
-                        'confidence': type_conf
-                    }
-                
-                # Get other attributes in parallel-ish (still sequential but fast)
-                formality, _ = self._classify(image, list(self.formality_levels.keys()))
-                formality = self.formality_levels[formality]
-                
-                pattern, _ = self._classify(image, list(self.patterns.keys()))
-                pattern = self.patterns[pattern]
-                
-                season, _ = self._classify(image, list(self.seasons.keys()))
-                season = self.seasons[season]
+            # All attributes from a single image encode
+            results = self._classify_all(image)
+            clothing_type, type_conf = results['type']
+
+            # If very low confidence, might not be clothing
+            if type_conf < 0.15:
+                return {
+                    'success': False,
+                    'error': 'not_clothing',
+                    'message': 'Could not detect clothing in image',
+                    'confidence': type_conf
+                }
+
+            formality = self.formality_levels[results['formality'][0]]
+            pattern = self.patterns[results['pattern'][0]]
+            season = self.seasons[results['season'][0]]
             
             # Extract colors (fast, no GPU needed)
             colors = self._extract_colors(image)
@@ -116,52 +218,92 @@ class ClothingClassifier:
                 'confidence': 0
             }
     
-    def _classify(self, image, labels):
-        """Classify image against a list of labels - GPU accelerated"""
-        text_labels = [f"a photo of {label}" for label in labels]
-        
-        inputs = self.processor(
-            text=text_labels,
-            images=image,
-            return_tensors="pt",
-            padding=True
-        )
-        
-        # Move to GPU
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            probs = outputs.logits_per_image.softmax(dim=1)[0]
-        
-        best_idx = probs.argmax().item()
-        confidence = probs[best_idx].item()
-        
-        return labels[best_idx], confidence
+    def _classify_all(self, image):
+        """Classify all attribute groups from one image encode.
+
+        Returns {group: (best_label, confidence)} by slicing a single
+        cosine-similarity matrix against the text features cached at init.
+        """
+        key = hashlib.blake2b(image.tobytes(), digest_size=16).digest()
+        image_features = self._embed_cache.get(key)
+        if image_features is None:
+            inputs = self.processor(images=image, return_tensors="pt")
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            if self.device == "cuda":
+                inputs['pixel_values'] = inputs['pixel_values'].half()
+
+            with torch.inference_mode():
+                image_features = self.model.get_image_features(**inputs)
+                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+
+            self._embed_cache[key] = image_features
+            if len(self._embed_cache) > self._embed_cache_size:
+                self._embed_cache.popitem(last=False)
+        else:
+            self._embed_cache.move_to_end(key)
+
+        with torch.inference_mode():
+            logits = (image_features @ self._text_features.T * self.model.logit_scale.exp())[0]
+
+        results = {}
+        for name, labels in self._groups.items():
+            start, end = self._offsets[name]
+            probs = logits[start:end].softmax(dim=0)
+            best_idx = probs.argmax().item()
+            results[name] = (labels[best_idx], probs[best_idx].item())
+        return results
     
     def _extract_colors(self, image):
-        """Extract dominant colors using K-means - CPU is fine"""
+        """Extract dominant colors via a 4-bit-per-channel histogram.
+
+        A 4096-bin bincount over the pixels replaces k-means - one
+        vectorized pass instead of iterative clustering, for a 2-color
+        UI palette where bin centers are plenty accurate.
+        """
         # Resize for speed
-        small_img = image.resize((50, 50))
-        pixels = np.array(small_img).reshape(-1, 3)
-        
-        # Filter out very light and very dark pixels
-        mask = (pixels.sum(axis=1) > 30) & (pixels.sum(axis=1) < 730)
-        filtered_pixels = pixels[mask]
-        
+        small_img = image.resize((50, 50), Image.Resampling.BILINEAR)
+        pixels = np.asarray(small_img, dtype=np.uint8).reshape(-1, 3)
+
+        # Filter out very light and very dark pixels (sum computed once)
+        s = pixels.sum(axis=1)
+        filtered_pixels = pixels[(s > 30) & (s < 730)]
+
         if len(filtered_pixels) < 2:
             return ['#808080', '#808080']
-        
-        kmeans = KMeans(n_clusters=2, random_state=42, n_init=10)
-        kmeans.fit(filtered_pixels)
-        
-        colors = kmeans.cluster_centers_.astype(int)
-        hex_colors = ['#{:02x}{:02x}{:02x}'.format(r, g, b) for r, g, b in colors]
-        
-        return hex_colors
+
+        q = (filtered_pixels >> 4).astype(np.uint16)
+        keys = (q[:, 0] << 8) | (q[:, 1] << 4) | q[:, 2]
+        counts = np.bincount(keys, minlength=4096)
+        top = np.argpartition(counts, -2)[-2:]
+        top = top[np.argsort(counts[top])[::-1]]
+        # Flat images fill a single bin - drop zero-count bins so the
+        # secondary color never becomes a phantom no pixel has
+        top = top[counts[top] > 0]
+
+        # Decode bins to channel midpoints, pack to 24-bit, format once
+        r = ((top >> 8) << 4) | 0x8
+        g = ((top >> 4 & 0xF) << 4) | 0x8
+        b = ((top & 0xF) << 4) | 0x8
+        packed = (r.astype(np.uint32) << 16) | (g << 8) | b
+
+        colors = [f'#{v:06x}' for v in packed]
+        if len(colors) < 2:
+            colors.append(colors[0])  # repeat dominant, like k-means did
+        return colors
+
+
+# Process-wide singleton - the CLIP load takes seconds, so every caller
+# should share one instance
+_INSTANCE = None
+
+def get_classifier():
+    global _INSTANCE
+    if _INSTANCE is None:
+        _INSTANCE = ClothingClassifier()
+    return _INSTANCE
 
 
 # Test
 if __name__ == "__main__":
-    classifier = ClothingClassifier()
+    classifier = get_classifier()
     print("Classifier ready for testing!")
@@ -11,7 +11,6 @@ import torch
 from PIL import Image
 import time
 from transformers import CLIPProcessor, CLIPModel
-from sklearn.cluster import KMeans
 import numpy as np
 
 st.set_page_config(page_title="Clothing Analyzer", page_icon="👔", layout="wide")
@@ -32,37 +31,92 @@ MATERIALS = ["cotton", "denim", "leather", "wool", "polyester", "silk", "linen",
 
 FITS = ["tight fitted", "slim fit", "regular fit", "relaxed fit", "loose oversized"]
 
+LABEL_GROUPS = {
+    'type': (CLOTHING_TYPES, "a photo of "),
+    'pattern': (PATTERNS, "clothing with "),
+    'formality': (FORMALITY, "a photo of "),
+    'season': (SEASONS, ""),
+    'material': (MATERIALS, "clothing made of "),
+    'fit': (FITS, "a photo of "),
+}
+
 # ===== MODEL =====
 @st.cache_resource
 def load_model():
     model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
+    model.eval()
+    if torch.cuda.is_available():
+        model = model.to("cuda")
+        # Fuses CLIP's many small ops; worthwhile since input shapes are
+        # fixed (reduce-overhead needs CUDA graphs, so CPU stays eager)
+        try:
+            model = torch.compile(model, mode="reduce-overhead")
+        except Exception:
+            pass  # older torch - run eager
     processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-    return model, processor
 
-def classify(model, processor, image, labels, prefix="a photo of "):
-    inputs = processor(text=[f"{prefix}{l}" for l in labels], images=image, return_tensors="pt", padding=True)
-    with torch.no_grad():
-        probs = model(**inputs).logits_per_image.softmax(dim=1)[0]
+    # The prompts never change, so run the text tower exactly once over
+    # all groups concatenated, then hand each group its slice; each
+    # analysis then pays only for the image side plus a matmul
+    prompts = []
+    slices = {}
+    for name, (labels, prefix) in LABEL_GROUPS.items():
+        slices[name] = slice(len(prompts), len(prompts) + len(labels))
+        prompts.extend(f"{prefix}{l}" for l in labels)
+
+    inputs = processor(text=prompts, return_tensors="pt",
+                       padding='max_length', max_length=77, truncation=True)
+    inputs = {k: v.to(model.device) for k, v in inputs.items()}
+    with torch.inference_mode():
+        feats = model.get_text_features(**inputs)
+    feats = feats / feats.norm(dim=-1, keepdim=True)
+    text_embeds = {name: feats[s] for name, s in slices.items()}
+
+    # Warm up: trigger any compilation on a dummy frame inside the cached
+    # loader rather than on the first real analysis
+    encode_image(model, processor, Image.new('RGB', (224, 224)))
+
+    return model, processor, text_embeds
+
+def encode_image(model, processor, image):
+    """One vision-encoder pass, shared by every attribute group"""
+    inputs = processor(images=image, return_tensors="pt")
+    inputs = {k: v.to(model.device) for k, v in inputs.items()}
+    with torch.inference_mode():
+        feats = model.get_image_features(**inputs)
+    return feats / feats.norm(dim=-1, keepdim=True)
+
+def classify(model, text_embeds, img_feats, group):
+    labels = LABEL_GROUPS[group][0]
+    with torch.inference_mode():
+        probs = (img_feats @ text_embeds[group].T * model.logit_scale.exp()).softmax(dim=1)[0]
     idx = probs.argmax().item()
     return labels[idx], probs[idx].item()
 
 def extract_colors(image, n=4):
+    """Dominant colors via the same 12-bit histogram the other apps use -
+    one bincount instead of ten k-means runs, with bin counts doubling as
+    the color proportions."""
     img = image.copy()
-    img.thumbnail((100, 100))
-    pixels = np.array(img).reshape(-1, 3)
-    mask = (pixels.sum(axis=1) > 30) & (pixels.sum(axis=1) < 730)
-    pixels = pixels[mask]
+    img.thumbnail((100, 100), Image.Resampling.BILINEAR)
+    pixels = np.asarray(img).reshape(-1, 3)
+    s = pixels.sum(axis=1)
+    pixels = pixels[(s > 30) & (s < 730)]
     if len(pixels) < n:
         return [("#000000", 100)]
-    kmeans = KMeans(n_clusters=n, random_state=42, n_init=10).fit(pixels)
-    colors = kmeans.cluster_centers_.astype(int)
-    _, counts = np.unique(kmeans.labels_, return_counts=True)
-    props = counts / len(kmeans.labels_)
-    results = []
-    for i in np.argsort(props)[::-1]:
-        hex_c = '#{:02x}{:02x}{:02x}'.format(*colors[i])
-        results.append((hex_c, float(props[i] * 100)))
-    return results
+    bins = ((pixels[:, 0] >> 4).astype(np.uint16) << 8) | \
+           ((pixels[:, 1] >> 4).astype(np.uint16) << 4) | \
+           (pixels[:, 2] >> 4)
+    counts = np.bincount(bins, minlength=4096)
+    top = np.argpartition(counts, -n)[-n:]
+    top = top[np.argsort(counts[top])[::-1]]
+    top = top[counts[top] > 0]
+    r = ((top >> 8) << 4) | 0x8
+    g = ((top >> 4 & 0xF) << 4) | 0x8
+    b = ((top & 0xF) << 4) | 0x8
+    packed = (r.astype(np.uint32) << 16) | (g << 8) | b
+    return [(f'#{v:06x}', float(c / len(pixels) * 100))
+            for v, c in zip(packed, counts[top])]
 
 # ===== UI =====
 st.title("👔 Clothing Analyzer")
@@ -84,17 +138,18 @@ with col1:
 
 with col2:
     if uploaded and run:
-        model, processor = load_model()
+        model, processor, text_embeds = load_model()
         start = time.time()
-        
-        # Run all analyses
+
+        # Run all analyses off a single image encode
         with st.spinner("Analyzing..."):
-            type_result = classify(model, processor, image, CLOTHING_TYPES)
-            pattern_result = classify(model, processor, image, PATTERNS, "clothing with ")
-            formality_result = classify(model, processor, image, FORMALITY)
-            season_result = classify(model, processor, image, SEASONS, "")
-            material_result = classify(model, processor, image, MATERIALS, "clothing made of ")
-            fit_result = classify(model, processor, image, FITS)
+            img_feats = encode_image(model, processor, image)
+            type_result = classify(model, text_embeds, img_feats, 'type')
+            pattern_result = classify(model, text_embeds, img_feats, 'pattern')
+            formality_result = classify(model, text_embeds, img_feats, 'formality')
+            season_result = classify(model, text_embeds, img_feats, 'season')
+            material_result = classify(model, text_embeds, img_feats, 'material')
+            fit_result = classify(model, text_embeds, img_feats, 'fit')
             colors = extract_colors(image)
         
         total_time = time.time() - start
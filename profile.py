@@ -14,11 +14,24 @@ from collections import defaultdict
 class StyleProfileManager:
     def __init__(self, db_path='wardrobe.db'):
         self.db_path = db_path
+        # One connection per manager instance - each method used to open
+        # and close its own, paying connect + page-cache warm-up per call
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        # Preferences only change via rate_outfit/reset_profile; cache the
+        # built dict so scoring loops don't re-query per outfit
+        self._prefs_cache = None
         self._ensure_tables()
-    
+
+    def close(self):
+        """Close the manager's connection"""
+        self._conn.close()
+
     def _ensure_tables(self):
         """Create style profile tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         c = conn.cursor()
         
         # Style preferences table
@@ -46,7 +59,6 @@ class StyleProfileManager:
         ''')
         
         conn.commit()
-        conn.close()
     
     def rate_outfit(self, outfit_id, rating, feedback=None):
         """
@@ -57,7 +69,7 @@ class StyleProfileManager:
             rating: 1-5 stars
             feedback: Optional text feedback
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         c = conn.cursor()
         
         # Save the rating
@@ -104,9 +116,9 @@ class StyleProfileManager:
             if occasion:
                 weight_change = (rating - 3) * 0.3
                 self._update_preference('occasion', occasion, weight_change, c)
-        
+
         conn.commit()
-        conn.close()
+        self._prefs_cache = None
     
     def _update_preference(self, pref_type, pref_value, weight_change, cursor):
         """Update or insert a preference with weight change"""
@@ -132,12 +144,12 @@ class StyleProfileManager:
                 'occasions': {'work': 1.5, 'casual': 2.0, ...}
             }
         """
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
+        if self._prefs_cache is not None:
+            return self._prefs_cache
+
+        c = self._conn.cursor()
         c.execute('SELECT preference_type, preference_value, weight FROM style_profile')
         rows = c.fetchall()
-        conn.close()
         
         preferences = {
             'colors': {},
@@ -157,7 +169,8 @@ class StyleProfileManager:
             key = type_map.get(pref_type, pref_type)
             if key in preferences:
                 preferences[key][pref_value] = weight
-        
+
+        self._prefs_cache = preferences
         return preferences
     
     def get_favorite_colors(self, limit=5):
@@ -234,22 +247,15 @@ class StyleProfileManager:
     
     def get_stats(self):
         """Get profile statistics"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        # Total ratings
-        c.execute('SELECT COUNT(*) FROM outfit_ratings')
-        total_ratings = c.fetchone()[0]
-        
-        # Average rating
-        c.execute('SELECT AVG(rating) FROM outfit_ratings')
-        avg_rating = c.fetchone()[0] or 0
-        
-        # Rating distribution
+        c = self._conn.cursor()
+
+        # One GROUP BY scan gives the distribution; total and average
+        # fall out of it without two extra passes over the table
         c.execute('SELECT rating, COUNT(*) FROM outfit_ratings GROUP BY rating')
         distribution = dict(c.fetchall())
-        
-        conn.close()
+
+        total_ratings = sum(distribution.values())
+        avg_rating = (sum(r * n for r, n in distribution.items()) / total_ratings) if total_ratings else 0
         
         return {
             'total_ratings': total_ratings,
@@ -259,11 +265,9 @@ class StyleProfileManager:
     
     def reset_profile(self):
         """Reset all learned preferences"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('DELETE FROM style_profile')
-        conn.commit()
-        conn.close()
+        self._conn.execute('DELETE FROM style_profile')
+        self._conn.commit()
+        self._prefs_cache = None
 
 
 # Quick feedback tags for rating
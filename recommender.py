@@ -3,6 +3,17 @@ import sqlite3
 from datetime import datetime
 import random
 
+# Which formality levels work for each occasion
+OCCASION_RULES = {
+    'gym': ['athletic', 'casual'],
+    'work': ['business', 'business-casual', 'formal'],
+    'casual': ['casual', 'business-casual'],
+    'date': ['business-casual', 'formal', 'casual'],
+    'home': ['casual', 'athletic'],
+    'party': ['formal', 'business-casual', 'casual'],
+    'formal': ['formal', 'business']
+}
+
 class OutfitRecommender:
     def __init__(self, db_path='wardrobe.db'):
         self.db_path = db_path
@@ -19,14 +30,8 @@ class OutfitRecommender:
         Returns:
             List of (outfit, score) tuples
         """
-        # Get all clothes from database
-        clothes = self._get_all_clothes()
-        
-        if len(clothes) < 2:
-            return []  # Not enough clothes
-        
-        # STEP 1: Filter by occasion
-        suitable = self._filter_by_occasion(clothes, occasion)
+        # STEP 1: Fetch only occasion-suitable candidates (filtered in SQL)
+        suitable = self._get_candidates(occasion)
         
         if not suitable['tops'] or not suitable['bottoms']:
             # Check if we have dresses at least
@@ -48,73 +53,50 @@ class OutfitRecommender:
         # STEP 5: Return top N, ensuring variety
         return self._select_diverse_outfits(scored_outfits, num_suggestions)
     
-    def _get_all_clothes(self):
-        """Fetch all clothes from database (excluding items in laundry)"""
+    def _get_candidates(self, occasion):
+        """Fetch outfit candidates with laundry and occasion filtering done in SQL"""
+        suitable_formality = OCCASION_RULES.get(occasion, ['casual'])
+        
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row  # Use Row for dict-like access
         c = conn.cursor()
         
-        # Exclude items that are in laundry
-        c.execute('SELECT * FROM clothes WHERE in_laundry = 0 OR in_laundry IS NULL')
+        # Only rows the combination step can actually use come back
+        placeholders = ','.join('?' * len(suitable_formality))
+        c.execute(f"""
+            SELECT id, image_path, clothing_type, color_primary, color_secondary,
+                   COALESCE(pattern, 'solid') AS pattern,
+                   COALESCE(formality, 'casual') AS formality,
+                   COALESCE(season_weight, 'medium') AS season_weight,
+                   COALESCE(times_worn, 0) AS times_worn
+            FROM clothes
+            WHERE (in_laundry = 0 OR in_laundry IS NULL)
+            AND COALESCE(formality, 'casual') IN ({placeholders})
+        """, suitable_formality)
         rows = c.fetchall()
         conn.close()
         
-        # Convert to list of dicts with proper column names
-        clothes_list = []
-        for row in rows:
-            clothes_list.append({
-                'id': row['id'],
-                'image_path': row['image_path'],
-                'type': row['clothing_type'],
-                'color_primary': row['color_primary'],
-                'color_secondary': row['color_secondary'],
-                'pattern': row['pattern'] or 'solid',
-                'formality': row['formality'] or 'casual',
-                'season': row['season_weight'] or 'medium',
-                'times_worn': row['times_worn'] or 0
-            })
-        
-        return clothes_list
-    
-    def _filter_by_occasion(self, clothes, occasion):
-        """Filter clothes suitable for occasion"""
-        
-        # Define which formality levels work for each occasion
-        occasion_rules = {
-            'gym': ['athletic', 'casual'],
-            'work': ['business', 'business-casual', 'formal'],
-            'casual': ['casual', 'business-casual'],
-            'date': ['business-casual', 'formal', 'casual'],
-            'home': ['casual', 'athletic'],
-            'party': ['formal', 'business-casual', 'casual'],
-            'formal': ['formal', 'business']
-        }
-        
-        suitable_formality = occasion_rules.get(occasion, ['casual'])
-        
         # Separate into categories
-        tops = [c for c in clothes 
-                if c['type'] == 'top' and c['formality'] in suitable_formality]
+        suitable = {'tops': [], 'bottoms': [], 'shoes': [], 'dresses': [], 'outerwear': []}
+        buckets = {'top': 'tops', 'bottom': 'bottoms', 'shoes': 'shoes',
+                   'dress': 'dresses', 'outerwear': 'outerwear'}
         
-        bottoms = [c for c in clothes 
-                   if c['type'] == 'bottom' and c['formality'] in suitable_formality]
-        
-        shoes = [c for c in clothes 
-                 if c['type'] == 'shoes' and c['formality'] in suitable_formality]
-        
-        dresses = [c for c in clothes 
-                   if c['type'] == 'dress' and c['formality'] in suitable_formality]
-        
-        outerwear = [c for c in clothes 
-                     if c['type'] == 'outerwear' and c['formality'] in suitable_formality]
+        for row in rows:
+            bucket = buckets.get(row['clothing_type'])
+            if bucket:
+                suitable[bucket].append({
+                    'id': row['id'],
+                    'image_path': row['image_path'],
+                    'type': row['clothing_type'],
+                    'color_primary': row['color_primary'],
+                    'color_secondary': row['color_secondary'],
+                    'pattern': row['pattern'],
+                    'formality': row['formality'],
+                    'season': row['season_weight'],
+                    'times_worn': row['times_worn']
+                })
         
-        return {
-            'tops': tops,
-            'bottoms': bottoms,
-            'shoes': shoes,
-            'dresses': dresses,
-            'outerwear': outerwear
-        }
+        return suitable
     
     def _filter_by_weather(self, suitable, weather):
         """Filter by weather appropriateness"""
@@ -15,6 +15,8 @@ class WeatherService:
         self.API_KEY = os.getenv('OPENWEATHER_API_KEY', 'ef785c660c0f2875d4b30d8eb775fb0c')
         self.default_city = os.getenv('DEFAULT_CITY', 'Theni')
         self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+        # Reuse one HTTP session so repeated calls keep the TCP connection alive
+        self.session = requests.Session()
     
     def get_weather(self, city=None):
         """
@@ -31,7 +33,7 @@ class WeatherService:
                 'units': 'metric'  # Celsius
             }
             
-            response = requests.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params, timeout=10)
             data = response.json()
             
             if response.status_code == 200: